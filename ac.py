@@ -1,19 +1,35 @@
 # Import required libraries for data handling, ML models, and embeddings
 import pandas as pd
-from sklearn.model_selection import train_test_split
+import numpy as np
+from sklearn.model_selection import train_test_split, StratifiedKFold
 from sklearn.metrics import accuracy_score
 from sklearn.linear_model import LogisticRegression
 from sklearn.svm import LinearSVC
 from sklearn.ensemble import RandomForestClassifier
-from sentence_transformers import SentenceTransformer
+from sklearn.base import clone
+from joblib import Parallel, delayed
+from concurrent.futures import ThreadPoolExecutor
 import os
+import time
+import hashlib
+import argparse
+from prefilter import CategoryIndex, index_path, INDEX_DIR
 
-# Load the sample dataset containing resume files and their respective categories
-df = pd.read_csv("sample_resumes_dataset.csv")
+# Embeddings are cached per (model, dataset hash) so re-runs and extra folds never re-encode
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".emb_cache")
 
-# Ensure the CSV has the required columns before proceeding
-if 'resume_file' not in df.columns or 'Category' not in df.columns:
-    raise ValueError("CSV must have 'resume_file' and 'Category' columns")
+# Define the list of sentence-transformer models to test embeddings
+embedding_models = [
+    "all-MiniLM-L6-v2",
+    "all-mpnet-base-v2"
+]
+
+# Define a dictionary of classifiers to compare performance (cloned fresh for every fold)
+classifiers = {
+    "Logistic Regression": LogisticRegression(max_iter=2000),
+    "Random Forest": RandomForestClassifier(n_estimators=200, random_state=42),
+    "Linear SVC": LinearSVC(max_iter=3000)
+}
 
 # Function to read the contents of a resume file safely
 def read_resume(path):
@@ -29,40 +45,178 @@ def read_resume(path):
         # If any error occurs during file reading, return the path as string
         return str(path)
 
-# Apply the function to all resume file paths to get the full resume text
-df['resume_text'] = df['resume_file'].apply(read_resume)
+def load_dataset(csv_path, workers=8):
+    """
+    Load the resume CSV and read every resume file (I/O-bound, so a thread pool
+    reads them concurrently instead of one after another).
+    """
+    df = pd.read_csv(csv_path)
 
-# Define the list of sentence-transformer models to test embeddings
-embedding_models = [
-    "all-MiniLM-L6-v2",
-    "all-mpnet-base-v2"
-]
+    # Ensure the CSV has the required columns before proceeding
+    if 'resume_file' not in df.columns or 'Category' not in df.columns:
+        raise ValueError("CSV must have 'resume_file' and 'Category' columns")
 
-# Define a dictionary of classifiers to compare performance
-classifiers = {
-    "Logistic Regression": LogisticRegression(max_iter=2000),
-    "Random Forest": RandomForestClassifier(n_estimators=200, random_state=42),
-    "Linear SVC": LinearSVC(max_iter=3000)
-}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        df['resume_text'] = list(pool.map(read_resume, df['resume_file']))
+    return df
+
+def dataset_hash(texts):
+    """Stable hash of the resume texts (in order); part of the embedding cache key."""
+    h = hashlib.sha256()
+    for text in texts:
+        h.update(text.encode("utf-8", errors="ignore"))
+        h.update(b"\0")
+    return h.hexdigest()[:16]
+
+def cache_path(model_name, data_hash, cache_dir=CACHE_DIR):
+    safe_model = model_name.replace("/", "__")
+    return os.path.join(cache_dir, f"{safe_model}_{data_hash}.npy")
+
+def encode_cached(model_name, texts, data_hash=None, cache_dir=CACHE_DIR):
+    """
+    Return (embeddings, encode_seconds). Embeddings come back memory-mapped from
+    the .npy cache when present (encode_seconds is then the time recorded when the
+    cache was built); otherwise the model encodes the whole dataset once and saves it.
+    """
+    data_hash = data_hash or dataset_hash(texts)
+    path = cache_path(model_name, data_hash, cache_dir)
+    timing_path = path[:-4] + ".seconds"
+    if os.path.exists(path):
+        encode_seconds = float("nan")
+        if os.path.exists(timing_path):
+            with open(timing_path) as f:
+                encode_seconds = float(f.read())
+        return np.load(path, mmap_mode="r"), encode_seconds
+
+    from sentence_transformers import SentenceTransformer
+    emb_model = SentenceTransformer(model_name)  # Load the embedding model
+    started = time.perf_counter()
+    embeddings = emb_model.encode(list(texts), show_progress_bar=True)
+    encode_seconds = time.perf_counter() - started
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = path[:-4] + ".tmp.npy"
+    np.save(tmp_path, np.asarray(embeddings, dtype=np.float32))
+    os.replace(tmp_path, path)  # atomic, so an interrupted run never leaves a half-written cache
+    with open(timing_path, "w") as f:
+        f.write(str(encode_seconds))
+    return np.load(path, mmap_mode="r"), encode_seconds
+
+def make_splits(y, folds, seed=42):
+    """(train_idx, test_idx) pairs: the original 80/20 split when folds < 2, else StratifiedKFold."""
+    indices = np.arange(len(y))
+    if folds < 2:
+        train_idx, test_idx = train_test_split(indices, test_size=0.2, random_state=seed)
+        return [(train_idx, test_idx)]
+    return list(StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed).split(indices, y))
+
+def fit_and_score(clf_name, clf, X, y, train_idx, test_idx):
+    """Train one classifier on one split and return its accuracy (runs inside the joblib pool)."""
+    model = clone(clf)
+    model.fit(X[train_idx], y[train_idx])  # Train the classifier
+    y_pred = model.predict(X[test_idx])  # Predict the test labels
+    return {"classifier": clf_name, "accuracy": accuracy_score(y[test_idx], y_pred) * 100}  # Calculate accuracy
+
+def time_classifier(clf, X, y, train_idx, test_idx):
+    """
+    Train and predict once more, serially, after the parallel runs. Timing inside the
+    joblib pool would measure cores contended by the other fits, not the classifier.
+    Returns (train seconds, inference ms per resume).
+    """
+    model = clone(clf)
+    started = time.perf_counter()
+    model.fit(X[train_idx], y[train_idx])
+    train_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    model.predict(X[test_idx])
+    infer_seconds = time.perf_counter() - started
+    return train_seconds, infer_seconds * 1000 / max(len(test_idx), 1)
+
+def run_experiments(df, models=embedding_models, folds=0, n_jobs=-1, cache_dir=CACHE_DIR):
+    """
+    Encode once per model (cached), then train every classifier on every fold in
+    parallel with joblib for accuracy. Train/inference times come from a separate
+    serial run on the first split. Returns a DataFrame with one row per (model, classifier).
+    """
+    texts = df['resume_text'].tolist()
+    y = df['Category'].to_numpy()
+    data_hash = dataset_hash(texts)
+    splits = make_splits(y, folds)
+    rows = []
+
+    # Loop through each embedding model to test its performance
+    for emb_model_name in models:
+        print(f"\n🔹 Using Embeddings from: {emb_model_name}")
+        X, encode_seconds = encode_cached(emb_model_name, texts, data_hash, cache_dir)
+
+        # Train and evaluate each classifier on each split (memory-mapped X is shared, not copied)
+        fold_results = Parallel(n_jobs=n_jobs)(
+            delayed(fit_and_score)(clf_name, clf, X, y, train_idx, test_idx)
+            for clf_name, clf in classifiers.items()
+            for train_idx, test_idx in splits
+        )
+        summary = pd.DataFrame(fold_results).groupby("classifier", sort=False).agg(
+            accuracy=("accuracy", "mean"),
+            accuracy_std=("accuracy", "std"),
+        ).reset_index()
+        train_idx, test_idx = splits[0]
+        timings = {name: time_classifier(clf, X, y, train_idx, test_idx) for name, clf in classifiers.items()}
+        summary["train_s"] = summary["classifier"].map(lambda name: timings[name][0])
+        summary["infer_ms_per_resume"] = summary["classifier"].map(lambda name: timings[name][1])
+        summary.insert(0, "model", emb_model_name)
+        summary["encode_ms_per_resume"] = encode_seconds * 1000 / max(len(texts), 1)
+        for _, r in summary.iterrows():
+            print(
+                f"   ✅ {r['classifier']} Accuracy: {r['accuracy']:.2f}%"
+                + (f" ± {r['accuracy_std']:.2f}" if len(splits) > 1 else "")
+                + f" | train {r['train_s']:.2f}s | inference {r['infer_ms_per_resume']:.3f} ms/resume"
+            )  # Display result
+        print(f"   ⏱️ Encode: {summary['encode_ms_per_resume'].iloc[0]:.1f} ms/resume")
+        rows.append(summary)
+
+    return pd.concat(rows, ignore_index=True)
 
-# Split dataset into training and testing sets (80% train, 20% test)
-X_train, X_test, y_train, y_test = train_test_split(
-    df['resume_text'], df['Category'], test_size=0.2, random_state=42
-)
+def build_prefilter_indexes(df, models=embedding_models, cache_dir=CACHE_DIR, index_dir=INDEX_DIR):
+    """
+    Save a per-category centroid index for each model into `index_dir`, where the
+    app's two-stage ranking loads it (RM_PREFILTER_DIR). Reuses the cached document
+    embeddings from `cache_dir`.
+    """
+    texts = df['resume_text'].tolist()
+    data_hash = dataset_hash(texts)
+    for emb_model_name in models:
+        X, _ = encode_cached(emb_model_name, texts, data_hash, cache_dir)
+        index = CategoryIndex.build(X, df['Category'].to_numpy())
+        path = index_path(emb_model_name, index_dir)
+        index.save(path)
+        print(f"🧭 Pre-filter index for {emb_model_name}: {len(index.categories)} categories -> {path}")
 
-# Loop through each embedding model to test its performance
-for emb_model_name in embedding_models:
-    print(f"\n🔹 Using Embeddings from: {emb_model_name}")
-    emb_model = SentenceTransformer(emb_model_name)  # Load the embedding model
+def main():
+    parser = argparse.ArgumentParser(description="Compare embedding models + classifiers on resume categories.")
+    parser.add_argument("--csv", default="sample_resumes_dataset.csv", help="CSV with resume_file and Category columns")
+    parser.add_argument("--models", nargs="+", default=embedding_models, help="sentence-transformer model names")
+    parser.add_argument("--folds", type=int, default=0, help="k for stratified k-fold CV (0 = single 80/20 split)")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="joblib workers for classifier training")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="where cached .npy embeddings live")
+    parser.add_argument("--out", help="optional CSV path for the results table")
+    parser.add_argument("--build-prefilter", action="store_true",
+                        help="also save category centroid indexes for the app's pre-filter")
+    parser.add_argument("--prefilter-dir", default=INDEX_DIR,
+                        help="where --build-prefilter saves the indexes (the app reads RM_PREFILTER_DIR)")
+    args = parser.parse_args()
 
-    # Convert the resume text into numerical embeddings
-    X_train_emb = emb_model.encode(X_train.tolist(), show_progress_bar=True)
-    X_test_emb = emb_model.encode(X_test.tolist(), show_progress_bar=True)
+    # Load the sample dataset containing resume files and their respective categories
+    df = load_dataset(args.csv)
+    results = run_experiments(df, args.models, args.folds, args.n_jobs, args.cache_dir)
 
-    # Train and evaluate each classifier on the embeddings
-    for clf_name, clf in classifiers.items():
-        clf.fit(X_train_emb, y_train)  # Train the classifier
-        y_pred = clf.predict(X_test_emb)  # Predict the test labels
-        accuracy = accuracy_score(y_test, y_pred) * 100  # Calculate accuracy
-        print(f"   ✅ {clf_name} Accuracy: {accuracy:.2f}%")  # Display result
+    # Speed next to accuracy, so model selection weighs both
+    print("\n📊 Summary")
+    print(results.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    if args.out:
+        results.to_csv(args.out, index=False)
+    if args.build_prefilter:
+        build_prefilter_indexes(df, args.models, args.cache_dir, args.prefilter_dir)
 
+if __name__ == "__main__":
+    main()
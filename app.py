@@ -1,23 +1,22 @@
 import streamlit as st
-from sentence_transformers import SentenceTransformer, util
-import os, tempfile, io, uuid
-from io import BytesIO
-import PyPDF2, docx, pdfplumber
+from sentence_transformers import SentenceTransformer
+import os, time
 import nltk
-from nltk.tokenize import sent_tokenize
-import numpy as np
 import pandas as pd
 import json
 import streamlit.components.v1 as components
-from db import init_db, insert_resume, fetch_resumes
+from db import init_db, fetch_resumes
+from db_async import AsyncWriter, ShortlistSaver
+from ingest import iter_extracted, upload_size, RssMonitor, MAX_BATCH_BYTES, MB
+from scoring import NLTK_DATA_DIR, score_extracted, rank_results, db_record
+from dedup import DuplicateIndex, fingerprint, attach_duplicates, NEAR_DUP_THRESHOLD
+from prefilter import prefilter, load_index, pruned_result, shortlist_recall, PRUNE_RATIO
+from skills import all_skills, extract_profile, missing_skills, filtered_result
+import jobs
 
 # ---------- Init ----------
 # ✅ Robust NLTK punkt setup (local nltk_data + download fallback)
-HERE = os.path.dirname(__file__)
-NLTK_DATA_DIR = os.path.join(HERE, "nltk_data")
 os.makedirs(NLTK_DATA_DIR, exist_ok=True)
-if NLTK_DATA_DIR not in nltk.data.path:
-    nltk.data.path.insert(0, NLTK_DATA_DIR)
 try:
     nltk.data.find("tokenizers/punkt")
 except LookupError:
@@ -50,6 +49,23 @@ if "top_k" not in st.session_state:
     st.session_state.top_k = 10
 if "score_threshold" not in st.session_state:
     st.session_state.score_threshold = 0.45
+if "batch_budget_mb" not in st.session_state:
+    st.session_state.batch_budget_mb = MAX_BATCH_BYTES // MB
+if "near_dup_threshold" not in st.session_state:
+    st.session_state.near_dup_threshold = NEAR_DUP_THRESHOLD
+if "prune_ratio" not in st.session_state:
+    st.session_state.prune_ratio = PRUNE_RATIO
+if "measure_prefilter" not in st.session_state:
+    st.session_state.measure_prefilter = False
+if "required_skills" not in st.session_state:
+    st.session_state.required_skills = []
+if "save_as_scored" not in st.session_state:
+    st.session_state.save_as_scored = False
+if "background_min_files" not in st.session_state:
+    st.session_state.background_min_files = 25
+# A background job id survives reloads through the URL (?job=...)
+if "job_id" not in st.session_state:
+    st.session_state.job_id = st.query_params.get("job")
 
 # ---------- Global CSS ----------
 st.markdown("""
@@ -281,6 +297,34 @@ if st.session_state.show_settings:
     st.session_state.score_threshold = st.slider(
         "Score threshold ≥", 0.0, 1.0, float(st.session_state.score_threshold)
     )
+    st.session_state.batch_budget_mb = st.number_input(
+        "Batch upload budget (MB)", min_value=5, max_value=2048, value=int(st.session_state.batch_budget_mb),
+        help="Total size of resumes processed per run; files beyond it are skipped."
+    )
+    st.session_state.required_skills = st.multiselect(
+        "Must-have skills", all_skills(), default=st.session_state.required_skills,
+        help="Resumes that do not mention every one of these skills (or a synonym) are filtered out before scoring."
+    )
+    st.session_state.near_dup_threshold = st.slider(
+        "Near-duplicate similarity ≥", 0.5, 1.0, float(st.session_state.near_dup_threshold),
+        help="Resumes this similar to an earlier upload are grouped with it and not scored again. 1.0 = exact copies only."
+    )
+    st.session_state.prune_ratio = st.slider(
+        "Pre-filter: prune share", 0.0, 0.9, float(st.session_state.prune_ratio), step=0.05,
+        help="Share of resumes dropped by a cheap whole-document match before sentence scoring. 0 = off."
+    )
+    st.session_state.measure_prefilter = st.checkbox(
+        "Measure pre-filter recall (scores pruned resumes too)", value=bool(st.session_state.measure_prefilter)
+    )
+    st.session_state.save_as_scored = st.checkbox(
+        "Save every resume above the threshold as it is scored", value=bool(st.session_state.save_as_scored),
+        help="Off: only the Top K shortlist is saved (kept up to date while scoring)."
+    )
+    st.session_state.background_min_files = st.number_input(
+        "Run in background from N files", min_value=1, max_value=1000,
+        value=int(st.session_state.background_min_files),
+        help="Larger batches run as a resumable background job that survives page reloads."
+    )
     st.markdown('</div>', unsafe_allow_html=True)
 
 # ---------- Model ----------
@@ -290,6 +334,17 @@ def load_model(name):
 
 model = load_model(st.session_state.model_name)
 
+# Category centroids built by `ac.py --build-prefilter` (None until built for this model)
+@st.cache_resource(show_spinner=False)
+def load_category_index(name):
+    return load_index(name)
+
+# One background event loop + connection pool per server process, shared by all sessions,
+# so DB writes run concurrently with scoring instead of blocking the script thread.
+@st.cache_resource(show_spinner=False)
+def get_db_writer():
+    return AsyncWriter()
+
 # ---------- Upload Panel ----------
 with st.container():
     col = st.columns([1, 8, 1])[1]
@@ -307,15 +362,7 @@ with st.container():
         MAX_FILE_SIZE = 5 * 1024 * 1024  # 5 MB in bytes
         valid_files = []
         for f in uploaded_files or []:
-            try:
-                size = f.size
-            except Exception:
-                try:
-                    f.seek(0, io.SEEK_END)
-                    size = f.tell()
-                    f.seek(0)
-                except Exception:
-                    size = None
+            size = upload_size(f)
             if size is None:
                 valid_files.append(f)
             else:
@@ -332,93 +379,50 @@ with st.container():
         jd_text = st.text_area("Paste the job description here", height=140)
         analyze = st.button("Analyze Match")
 
-# ---------- Helpers ----------
-def extract_text_from_pdf(file_bytes):
-    text = ""
-    try:
-        with pdfplumber.open(BytesIO(file_bytes)) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-    except Exception:
-        try:
-            reader = PyPDF2.PdfReader(BytesIO(file_bytes))
-            for p in reader.pages:
-                page_text = p.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-        except Exception as e:
-            st.warning(f"PDF parsing error: {e}")
-    return text
-
-def extract_text_from_docx(file_bytes):
-    text = ""
-    try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".docx") as tmp:
-            tmp.write(file_bytes)
-            tmp.flush()
-            d = docx.Document(tmp.name)
-            for p in d.paragraphs:
-                if p.text:
-                    text += p.text + "\n"
-    finally:
-        try:
-            os.remove(tmp.name)
-        except Exception:
-            pass
-    return text
-
-def extract_text_from_txt(file_bytes):
-    try:
-        return file_bytes.decode(errors="ignore")
-    except Exception:
-        return str(file_bytes)
-
-def parse_resume(uploaded_file):
-    name = uploaded_file.name or "unknown_resume"
-    raw = uploaded_file.read()
-    ext = name.split(".")[-1].lower()
-    text = ""
-    if ext == "pdf":
-        text = extract_text_from_pdf(raw)
-    elif ext == "docx":
-        text = extract_text_from_docx(raw)
-    elif ext == "txt":
-        text = extract_text_from_txt(raw)
-    else:
-        st.warning(f"Unsupported format: {name}")
-    return name, text.strip()
-
-# ---------- sentence_split (robust fallback) ----------
-import re
-def sentence_split(text):
-    """
-    Prefer NLTK sent_tokenize, but fall back to a regex-based splitter if punkt is missing.
-    Returns a list of non-empty sentence strings with length > 10.
-    """
-    if not isinstance(text, str) or not text.strip():
-        return []
+# ---------- Results ----------
+def render_results(results):
+    results_sorted, shortlisted = rank_results(results, st.session_state.score_threshold, st.session_state.top_k)
+    col1, col2 = st.columns([1, 1.2])
+    with col1:
+        st.header("Shortlisted Candidates")
+        if not shortlisted:
+            st.info("No candidate passed the threshold.")
+        else:
+            for i, r in enumerate(shortlisted, start=1):
+                st.subheader(f"{i}. {r['name']}")
+                if r.get("duplicates"):
+                    st.caption("Also uploaded as: " + ", ".join(r["duplicates"]))
+                if r.get("skills"):
+                    st.caption("Skills: " + ", ".join(r["skills"]))
+                st.write(f"Score: **{r['score']:.4f}** | Best sentence score: {r['best_sentence_score']:.4f}")
+                with st.expander("Top matching sentences"):
+                    for tm in r["top_matches"]:
+                        st.markdown(f"- ({tm['score']:.3f}) {tm['sentence']}")
+                    st.download_button(
+                        label="Download extracted resume text",
+                        data="\n".join(r["resume_sentences"]),
+                        file_name=f"{r['name']}_extracted.txt"
+                    )
+    with col2:
+        st.header("All Candidates (ranked)")
+        for i, r in enumerate(results_sorted, start=1):
+            dup_note = f" (+{len(r['duplicates'])} duplicate{'s' if len(r['duplicates']) > 1 else ''})" if r.get("duplicates") else ""
+            if r.get("missing_skills"):
+                st.write(f"{i}. {r['name']} — filtered out, missing: {', '.join(r['missing_skills'])}{dup_note}")
+            elif r.get("pruned"):
+                st.write(f"{i}. {r['name']} — pre-filtered as off-role (stage-1 score {r['prefilter_score']:.3f}){dup_note}")
+            else:
+                st.write(f"{i}. {r['name']} — score: **{r['score']:.4f}**{dup_note}")
+
+# ---------- Background jobs ----------
+# Relaunch jobs whose worker died (e.g. server restart) and purge expired ones, once per browser session
+if "jobs_resumed" not in st.session_state:
+    st.session_state.jobs_resumed = True
     try:
-        sents = sent_tokenize(text)
-    except LookupError:
-        parts = re.split(r'(?<=[.!?])\s+', text.strip())
-        sents = [p for p in parts if p]
-    return [s.strip() for s in sents if len(s.strip()) > 10]
-
-def compute_resume_score(jd_embedding, resume_text, model):
-    sents = sentence_split(resume_text)
-    if not sents:
-        return {"score": 0.0, "top_matches": [], "resume_sentences": []}
-    sent_embs = model.encode(sents, convert_to_tensor=True, show_progress_bar=False)
-    cos_scores = util.pytorch_cos_sim(jd_embedding, sent_embs)[0].cpu().numpy()
-    best_idx = int(np.argmax(cos_scores))
-    best_score = float(cos_scores[best_idx])
-    top_n = min(5, len(cos_scores))
-    overall = float(np.mean(sorted(cos_scores, reverse=True)[:top_n]))
-    top_matches_idx = np.argsort(-cos_scores)[:top_n]
-    top_matches = [{"sentence": sents[int(i)], "score": float(cos_scores[int(i)])} for i in top_matches_idx]
-    return {"score": overall, "best_sentence_score": best_score, "top_matches": top_matches, "resume_sentences": sents}
+        jobs.resume_interrupted_jobs()
+        jobs.purge_old_jobs()
+    except Exception as e:
+        st.warning(f"Could not resume background jobs: {e}")
 
 # ---------- Run pipeline ----------
 if analyze:
@@ -426,59 +430,164 @@ if analyze:
         st.error("Please upload at least one resume.")
     elif not jd_text.strip():
         st.error("Please paste/enter a job description.")
+    elif len(uploaded_files) >= int(st.session_state.background_min_files):
+        with st.spinner("Queuing background job..."):
+            job_id = jobs.create_job(
+                uploaded_files, jd_text, st.session_state.model_name, st.session_state.score_threshold,
+                max_batch_bytes=int(st.session_state.batch_budget_mb) * MB,
+                near_dup_threshold=st.session_state.near_dup_threshold,
+                prune_ratio=st.session_state.prune_ratio,
+                top_k=st.session_state.top_k,
+                required_skills=st.session_state.required_skills,
+                save_as_scored=st.session_state.save_as_scored
+            )
+            jobs.start_worker(job_id)
+        st.session_state.job_id = job_id
+        st.query_params["job"] = job_id
     else:
-        with st.spinner("Processing..."):
+        st.session_state.job_id = None
+        st.query_params.pop("job", None)
+        # Samples RSS during this run; ru_maxrss would be the whole server's lifetime peak
+        with st.spinner("Processing..."), RssMonitor() as memory:
+            writer = get_db_writer()
             jd_embedding = model.encode(jd_text, convert_to_tensor=True, show_progress_bar=False)
-            results = []
-            for f in uploaded_files:
-                name, text = parse_resume(f)
-                if not text:
-                    results.append({"name": name, "score": 0.0, "top_matches": [], "error": "no text extracted"})
-                    continue
-                res = compute_resume_score(jd_embedding, text, model)
-                res["name"] = name
-                results.append(res)
-            results_sorted = sorted(results, key=lambda x: x.get("score", 0.0), reverse=True)
-            shortlisted = [r for r in results_sorted if r.get("score", 0.0) >= st.session_state.score_threshold][:int(st.session_state.top_k)]
-
-        st.success(f"Processed {len(results)} resumes — shortlisted {len(shortlisted)}")
-
-        for i, r in enumerate(shortlisted, start=1):
-            unique_id = str(uuid.uuid4())[:8]
-            unique_name = f"{i}_{unique_id}_{r['name']}"
-            try:
-                insert_resume(
-                    unique_name,
-                    r['name'],
-                    r['score'],
-                    r['best_sentence_score'],
-                    r['top_matches'],
-                    "\n".join(r['resume_sentences'])
+            results = {}
+            writes = []
+            saver = ShortlistSaver(writer, st.session_state.top_k, st.session_state.score_threshold)
+            profiles = {}
+            duplicate_pairs = []
+            dup_index = DuplicateIndex(st.session_state.near_dup_threshold)
+
+            def unique_resumes():
+                # Uploads are spooled and extracted under a byte budget, one buffer at a time
+                extracted = iter_extracted(uploaded_files, max_batch_bytes=int(st.session_state.batch_budget_mb) * MB)
+                for idx, (name, text, error) in enumerate(extracted, start=1):
+                    if error:
+                        st.warning(error)
+                    digest = None
+                    if text:
+                        # Copies of an earlier upload are grouped with it and never encoded
+                        digest, signature = fingerprint(text)
+                        rep = dup_index.add(idx, digest, signature)
+                        if rep is not None:
+                            duplicate_pairs.append((name, rep))
+                            continue
+                        # Skills come from one linear pass over the text; a resume missing a
+                        # must-have skill is settled here, before any model inference
+                        profile = profiles[idx] = extract_profile(text)
+                        missing = missing_skills(profile["skills"], st.session_state.required_skills)
+                        if missing:
+                            results[idx] = filtered_result(name, missing, profile)
+                            continue
+                    yield idx, name, text, digest
+
+            candidates = unique_resumes()
+            prune_ratio = float(st.session_state.prune_ratio)
+            pruned = []
+            if prune_ratio > 0:
+                # Stage 1: one document embedding per resume; only the best share go on to
+                # per-sentence scoring. Empty extractions skip stage 1 (they score 0 anyway).
+                candidates = list(candidates)
+                with_text = [c for c in candidates if c[2]]
+                keep, drop, stage1, stage1_seconds = prefilter(
+                    model, jd_text, [c[2] for c in with_text], prune_ratio,
+                    min_keep=int(st.session_state.top_k), index=load_category_index(st.session_state.model_name)
                 )
-            except Exception as e:
-                st.warning(f"Failed to save to DB: {e}")
-
-        col1, col2 = st.columns([1, 1.2])
-        with col1:
-            st.header("Shortlisted Candidates")
-            if not shortlisted:
-                st.info("No candidate passed the threshold.")
-            else:
-                for i, r in enumerate(shortlisted, start=1):
-                    st.subheader(f"{i}. {r['name']}")
-                    st.write(f"Score: **{r['score']:.4f}** | Best sentence score: {r['best_sentence_score']:.4f}")
-                    with st.expander("Top matching sentences"):
-                        for tm in r["top_matches"]:
-                            st.markdown(f"- ({tm['score']:.3f}) {tm['sentence']}")
-                        st.download_button(
-                            label="Download extracted resume text",
-                            data="\n".join(r["resume_sentences"]),
-                            file_name=f"{r['name']}_extracted.txt"
-                        )
-        with col2:
-            st.header("All Candidates (ranked)")
-            for i, r in enumerate(results_sorted, start=1):
-                st.write(f"{i}. {r['name']} — score: **{r['score']:.4f}**")
+                pruned = [(with_text[i], float(stage1[i])) for i in drop]
+                dropped = {with_text[i][0] for i in drop}
+                candidates = [c for c in candidates if c[0] not in dropped]
+
+            # Stage 2: full sentence-level scoring
+            stage2_started = time.perf_counter()
+            for idx, name, text, digest in candidates:
+                res = score_extracted(jd_embedding, name, text, model)
+                res.update(profiles.get(idx, {}))
+                results[idx] = res
+                # Writes overlap with encoding the next resume: by default the running Top K
+                # is kept saved (rows pushed out are deleted again); opt-in, every resume above
+                # the threshold. Naming by content hash means re-uploads update the same row.
+                if digest:
+                    record = db_record(f"{digest[:12]}_{name}", res)
+                    if not st.session_state.save_as_scored:
+                        saver.offer(record)
+                    elif res["score"] >= st.session_state.score_threshold:
+                        writes.append(writer.submit_insert(*record))
+            stage2_seconds = time.perf_counter() - stage2_started
+
+            prefilter_report = None
+            if pruned and st.session_state.measure_prefilter:
+                # Score the pruned resumes too (not saved) to see what the pre-filter cost
+                started = time.perf_counter()
+                full = dict(results)
+                for (idx, name, text, _), _score in pruned:
+                    full[idx] = score_extracted(jd_embedding, name, text, model)
+                pruned_seconds = time.perf_counter() - started
+                full_ranked = sorted(full.items(), key=lambda kv: kv[1].get("score", 0.0), reverse=True)
+                full_shortlist = [k for k, r in full_ranked if r.get("score", 0.0) >= st.session_state.score_threshold]
+                full_shortlist = full_shortlist[:int(st.session_state.top_k)]
+                prefilter_report = {
+                    "recall": shortlist_recall(full_shortlist, results.keys()),
+                    "two_stage_s": stage1_seconds + stage2_seconds,
+                    "full_s": stage2_seconds + pruned_seconds,
+                }
+            for (idx, name, _, _), stage1_score in pruned:
+                results[idx] = pruned_result(name, stage1_score)
+
+            attach_duplicates(results, duplicate_pairs)
+            results = list(results.values())
+            _, shortlisted = rank_results(results, st.session_state.score_threshold, st.session_state.top_k)
+            # The writer is shared by every session: wait only for this run's writes
+            db_errors = writer.drain(writes + saver.futures, timeout=30)
+
+        dup_note = f" ({len(duplicate_pairs)} duplicates skipped)" if duplicate_pairs else ""
+        filtered = sum(1 for r in results if r.get("missing_skills"))
+        skill_note = f", {filtered} missing must-have skills" if filtered else ""
+        prune_note = f", {len(pruned)} pre-filtered" if pruned else ""
+        st.success(f"Processed {len(results)} resumes{dup_note}{skill_note}{prune_note} — shortlisted {len(shortlisted)}")
+        if prefilter_report:
+            speedup = prefilter_report["full_s"] / max(prefilter_report["two_stage_s"], 1e-9)
+            st.caption(
+                f"Pre-filter: shortlist recall {prefilter_report['recall']:.0%} vs. full scoring; "
+                f"{prefilter_report['two_stage_s']:.1f}s two-stage vs. {prefilter_report['full_s']:.1f}s full ({speedup:.1f}× faster)"
+            )
+        if memory.delta_mb is not None:
+            st.caption(
+                f"Memory during this run: +{memory.delta_mb:.0f} MB "
+                f"(RSS {memory.baseline_mb:.0f} → {memory.peak_mb:.0f} MB, whole server process)"
+            )
+        if db_errors:
+            st.warning(f"Failed to save {len(db_errors)} resume(s) to DB: {db_errors[0]!r}")
+
+        render_results(results)
+
+poll_job = False
+if st.session_state.job_id:
+    status = jobs.job_status(st.session_state.job_id)
+    if status is None:
+        st.session_state.job_id = None
+        st.query_params.pop("job", None)
+    else:
+        finished = status["done"] + status["errors"] + status["duplicates"] + status["filtered"] + status["pruned"]
+        total = max(status["total"], 1)
+        st.progress(finished / total, text=f"Background job {status['id'][:8]} — {status['status']}: {finished}/{status['total']} resumes")
+        if status["status"] in jobs.ACTIVE_STATUSES:
+            if st.button("Cancel job"):
+                jobs.cancel_job(status["id"])
+                st.rerun()
+        elif status["status"] == "failed":
+            st.error(f"Background job failed: {status['error']}")
+        results, job_errors = jobs.job_results(status["id"])
+        for message in job_errors:
+            st.warning(message)
+        if status["status"] == "done":
+            _, shortlisted = rank_results(results, st.session_state.score_threshold, st.session_state.top_k)
+            dup_note = f" ({status['duplicates']} duplicates skipped)" if status["duplicates"] else ""
+            skill_note = f", {status['filtered']} missing must-have skills" if status["filtered"] else ""
+            prune_note = f", {status['pruned']} pre-filtered" if status["pruned"] else ""
+            st.success(f"Processed {len(results)} resumes{dup_note}{skill_note}{prune_note} — shortlisted {len(shortlisted)}")
+        if results:
+            render_results(results)
+        poll_job = status["status"] in jobs.ACTIVE_STATUSES
 
 # ---------- Features ----------
 with st.container():
@@ -558,3 +667,9 @@ with st.container():
             """,
             unsafe_allow_html=True
         )
+
+# ---------- Job polling ----------
+# Rerun after the page is drawn so progress updates while a background job runs
+if poll_job:
+    time.sleep(2)
+    st.rerun()
@@ -5,6 +5,8 @@ import mysql.connector
 from mysql.connector import Error
 from dotenv import load_dotenv
 from pathlib import Path
+import storage
+import skills
 
 # Force load .env from this file's directory (robust)
 load_dotenv(dotenv_path=Path(__file__).resolve().parent / ".env")
@@ -22,6 +24,63 @@ _RAW_DB = {
 # Filter out empty values to avoid passing None to mysql.connector
 DB_CONFIG = {k: v for k, v in _RAW_DB.items() if v not in (None, "", "None")}
 
+# "compact" stores resume text once per content hash (compressed) and packs match scores
+# as float16; "plain" keeps the original LONGTEXT/JSON columns. Reads handle both.
+STORAGE_MODE = os.getenv("DB_STORAGE_MODE", "compact").strip().lower()
+
+# Columns added to shortlisted_resumes after the original schema: the compact layout
+# plus extracted skills/sections (checked/added by init_db)
+_ADDED_COLUMNS = {
+    "resume_hash": "CHAR(64) NULL",
+    "top_sentences_blob": "BLOB NULL",
+    "top_scores": "VARBINARY(255) NULL",
+    "skills": "JSON NULL",
+    "sections": "JSON NULL",
+}
+
+_CREATE_RESUMES_SQL = """
+    CREATE TABLE IF NOT EXISTS shortlisted_resumes (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        candidate_name VARCHAR(255) UNIQUE,
+        file_name VARCHAR(255),
+        score FLOAT,
+        best_sentence_score FLOAT,
+        top_sentences JSON,
+        resume_text LONGTEXT,
+        resume_hash CHAR(64) NULL,
+        top_sentences_blob BLOB NULL,
+        top_scores VARBINARY(255) NULL,
+        skills JSON NULL,
+        sections JSON NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        INDEX idx_resume_hash (resume_hash)
+    ) CHARACTER SET utf8mb4;
+"""
+
+_CREATE_BLOBS_SQL = """
+    CREATE TABLE IF NOT EXISTS resume_blobs (
+        content_hash CHAR(64) PRIMARY KEY,
+        text_blob LONGBLOB NOT NULL,
+        raw_bytes INT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    ) CHARACTER SET utf8mb4;
+"""
+
+# One row per (candidate, canonical skill) so "must have X and Y" filters hit an index
+_CREATE_SKILLS_SQL = """
+    CREATE TABLE IF NOT EXISTS resume_skills (
+        candidate_name VARCHAR(255) NOT NULL,
+        skill VARCHAR(100) NOT NULL,
+        PRIMARY KEY (candidate_name, skill),
+        INDEX idx_skill (skill, candidate_name)
+    ) CHARACTER SET utf8mb4;
+"""
+
+_COLUMNS_SQL = (
+    "SELECT COLUMN_NAME FROM information_schema.COLUMNS "
+    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'shortlisted_resumes'"
+)
+
 def _connect_no_db():
     """
     Connect without selecting a database (used to run CREATE DATABASE).
@@ -88,6 +147,27 @@ def _create_database_if_missing():
         print("❌ Error creating database:", e)
         return False
 
+def _ensure_added_columns(cursor):
+    """
+    Add the compact-layout and skills columns to a shortlisted_resumes table created by an older
+    version (CREATE TABLE IF NOT EXISTS does not alter existing tables).
+    """
+    cursor.execute(_COLUMNS_SQL)
+    existing = {row[0] for row in cursor.fetchall()}
+    for statement in _added_column_ddl(existing):
+        cursor.execute(statement)
+        print("✅ Schema updated:", statement)
+
+def _added_column_ddl(existing):
+    """ALTER/CREATE INDEX statements needed to bring a table with `existing` columns up to date."""
+    statements = [
+        f"ALTER TABLE shortlisted_resumes ADD COLUMN {column} {ddl}"
+        for column, ddl in _ADDED_COLUMNS.items() if column not in existing
+    ]
+    if "resume_hash" not in existing:
+        statements.append("CREATE INDEX idx_resume_hash ON shortlisted_resumes (resume_hash)")
+    return statements
+
 def init_db():
     """
     Ensure the database and the main table exist. Returns a live connection (or None).
@@ -118,21 +198,13 @@ def init_db():
     try:
         if conn.is_connected():
             cursor = conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS shortlisted_resumes (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    candidate_name VARCHAR(255) UNIQUE,
-                    file_name VARCHAR(255),
-                    score FLOAT,
-                    best_sentence_score FLOAT,
-                    top_sentences JSON,
-                    resume_text LONGTEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                ) CHARACTER SET utf8mb4;
-            """)
+            cursor.execute(_CREATE_RESUMES_SQL)
+            cursor.execute(_CREATE_BLOBS_SQL)
+            cursor.execute(_CREATE_SKILLS_SQL)
+            _ensure_added_columns(cursor)
             conn.commit()
             cursor.close()
-            print("✅ Table 'shortlisted_resumes' ensured.")
+            print("✅ Tables 'shortlisted_resumes', 'resume_blobs' and 'resume_skills' ensured.")
         return conn
     except Exception as e:
         print("❌ Error ensuring table exists:", e)
@@ -142,10 +214,108 @@ def init_db():
             pass
         return None
 
-def insert_resume(candidate_name, file_name, score, best_sentence_score, top_sentences, resume_text):
+def _store_blob(cursor, resume_text):
+    """
+    Store `resume_text` in resume_blobs keyed by its content hash, unless an identical
+    resume is already there. Returns the hash to reference from shortlisted_resumes.
+    """
+    digest = storage.content_hash(resume_text)
+    cursor.execute(_TOUCH_BLOB_SQL, (digest,))
+    if cursor.rowcount < 1:
+        cursor.execute(_INSERT_BLOB_SQL, _blob_params(digest, resume_text))
+    return digest
+
+# Reusing a blob refreshes created_at (and row-locks it until commit), so gc_blobs' grace
+# period also protects an old, unreferenced blob that an in-flight insert is pointing at again.
+# 0 rows (missing, or already touched this second) falls through to an INSERT IGNORE.
+_TOUCH_BLOB_SQL = "UPDATE resume_blobs SET created_at = CURRENT_TIMESTAMP WHERE content_hash = %s"
+_INSERT_BLOB_SQL = "INSERT IGNORE INTO resume_blobs (content_hash, text_blob, raw_bytes) VALUES (%s, %s, %s)"
+
+def _blob_params(digest, resume_text):
+    return (digest, storage.encode_text(resume_text), len((resume_text or "").encode("utf-8")))
+
+_INSERT_PLAIN_SQL = """
+    INSERT INTO shortlisted_resumes
+    (candidate_name, file_name, score, best_sentence_score, top_sentences, resume_text,
+     resume_hash, top_sentences_blob, top_scores, skills, sections)
+    VALUES (%s, %s, %s, %s, %s, %s, NULL, NULL, NULL, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        score = VALUES(score),
+        best_sentence_score = VALUES(best_sentence_score),
+        top_sentences = VALUES(top_sentences),
+        resume_text = VALUES(resume_text),
+        resume_hash = NULL,
+        top_sentences_blob = NULL,
+        top_scores = NULL,
+        skills = VALUES(skills),
+        sections = VALUES(sections),
+        created_at = CURRENT_TIMESTAMP
+"""
+
+_INSERT_COMPACT_SQL = """
+    INSERT INTO shortlisted_resumes
+    (candidate_name, file_name, score, best_sentence_score, top_sentences, resume_text,
+     resume_hash, top_sentences_blob, top_scores, skills, sections)
+    VALUES (%s, %s, %s, %s, NULL, NULL, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        score = VALUES(score),
+        best_sentence_score = VALUES(best_sentence_score),
+        top_sentences = NULL,
+        resume_text = NULL,
+        resume_hash = VALUES(resume_hash),
+        top_sentences_blob = VALUES(top_sentences_blob),
+        top_scores = VALUES(top_scores),
+        skills = VALUES(skills),
+        sections = VALUES(sections),
+        created_at = CURRENT_TIMESTAMP
+"""
+
+def _json_or_none(value):
+    return None if value is None else json.dumps(value, ensure_ascii=False)
+
+def _plain_params(candidate_name, file_name, score, best_sentence_score, top_sentences, resume_text,
+                  skills=None, sections=None):
+    return (
+        candidate_name,
+        file_name,
+        score,
+        best_sentence_score,
+        json.dumps(top_sentences, ensure_ascii=False),
+        resume_text,
+        _json_or_none(skills),
+        _json_or_none(sections)
+    )
+
+def _compact_params(candidate_name, file_name, score, best_sentence_score, top_sentences, digest,
+                    skills=None, sections=None):
+    sentences_blob, scores_blob = storage.encode_top_matches(top_sentences)
+    return (
+        candidate_name,
+        file_name,
+        score,
+        best_sentence_score,
+        digest,
+        sentences_blob,
+        scores_blob,
+        _json_or_none(skills),
+        _json_or_none(sections)
+    )
+
+_DELETE_SKILLS_SQL = "DELETE FROM resume_skills WHERE candidate_name = %s"
+_DELETE_RESUME_SQL = "DELETE FROM shortlisted_resumes WHERE candidate_name = %s"
+_INSERT_SKILL_SQL = "INSERT IGNORE INTO resume_skills (candidate_name, skill) VALUES (%s, %s)"
+
+def _skill_rows(candidate_name, skills):
+    return [(candidate_name, skill) for skill in skills or []]
+
+def insert_resume(candidate_name, file_name, score, best_sentence_score, top_sentences, resume_text,
+                  skills=None, sections=None):
     """
     Insert or update a shortlisted resume entry.
-    `top_sentences` should be serializable (we store as JSON).
+    `top_sentences` should be serializable (we store as JSON, or as a compressed
+    sentence blob + float16 scores in compact mode). `skills` (canonical names from
+    skills.extract_profile) are also written to resume_skills for filtering; passing
+    None leaves the candidate's existing skill rows alone.
     """
     try:
         conn = get_connection()
@@ -153,24 +323,19 @@ def insert_resume(candidate_name, file_name, score, best_sentence_score, top_sen
             print("❌ No DB connection available for insert.")
             return
         cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO shortlisted_resumes
-            (candidate_name, file_name, score, best_sentence_score, top_sentences, resume_text)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-                score = VALUES(score),
-                best_sentence_score = VALUES(best_sentence_score),
-                top_sentences = VALUES(top_sentences),
-                resume_text = VALUES(resume_text),
-                created_at = CURRENT_TIMESTAMP
-        """, (
-            candidate_name,
-            file_name,
-            score,
-            best_sentence_score,
-            json.dumps(top_sentences, ensure_ascii=False),
-            resume_text
-        ))
+        if STORAGE_MODE == "compact":
+            digest = _store_blob(cursor, resume_text)
+            cursor.execute(_INSERT_COMPACT_SQL, _compact_params(
+                candidate_name, file_name, score, best_sentence_score, top_sentences, digest, skills, sections
+            ))
+        else:
+            cursor.execute(_INSERT_PLAIN_SQL, _plain_params(
+                candidate_name, file_name, score, best_sentence_score, top_sentences, resume_text, skills, sections
+            ))
+        if skills is not None:
+            cursor.execute(_DELETE_SKILLS_SQL, (candidate_name,))
+            if skills:
+                cursor.executemany(_INSERT_SKILL_SQL, _skill_rows(candidate_name, skills))
         conn.commit()
         cursor.close()
         conn.close()
@@ -179,10 +344,55 @@ def insert_resume(candidate_name, file_name, score, best_sentence_score, top_sen
     except Exception as e:
         print("❌ Unexpected error inserting resume:", e)
 
-def fetch_resumes(min_score=0.0, search_name=""):
+def _decode_row(row):
+    """
+    Turn a joined shortlisted_resumes/resume_blobs row back into the legacy shape:
+    `resume_text` as str and `top_sentences` as a JSON string, whichever layout stored it.
+    """
+    text_blob = row.pop("text_blob", None)
+    sentences_blob = row.pop("top_sentences_blob", None)
+    scores_blob = row.pop("top_scores", None)
+    if row.get("resume_text") is None and text_blob is not None:
+        row["resume_text"] = storage.decode_text(text_blob)
+    if row.get("top_sentences") is None and sentences_blob is not None:
+        row["top_sentences"] = json.dumps(
+            storage.decode_top_matches(sentences_blob, scores_blob), ensure_ascii=False
+        )
+    return row
+
+def _fetch_query(min_score, search_name, required_skills=None):
+    """Build the SELECT (and its params) shared by the sync and async fetch_resumes."""
+    query = (
+        "SELECT s.*, b.text_blob FROM shortlisted_resumes s "
+        "LEFT JOIN resume_blobs b ON b.content_hash = s.resume_hash "
+        "WHERE s.score >= %s"
+    )
+    params = [min_score]
+
+    if search_name:
+        query += " AND s.candidate_name LIKE %s"
+        params.append(f"%{search_name}%")
+
+    required_skills = sorted(set(required_skills or []))
+    if required_skills:
+        # Served from resume_skills' primary key: count how many of the required skills each row has
+        placeholders = ", ".join(["%s"] * len(required_skills))
+        query += (
+            " AND (SELECT COUNT(*) FROM resume_skills rs WHERE rs.candidate_name = s.candidate_name"
+            f" AND rs.skill IN ({placeholders})) = %s"
+        )
+        params.extend(required_skills)
+        params.append(len(required_skills))
+
+    query += " ORDER BY s.score DESC"
+    return query, tuple(params)
+
+def fetch_resumes(min_score=0.0, search_name="", required_skills=None):
     """
-    Fetch resumes with score >= min_score. Optionally filter by candidate_name LIKE search_name.
-    Returns a list of dicts (using cursor(dictionary=True)).
+    Fetch resumes with score >= min_score. Optionally filter by candidate_name LIKE search_name
+    and to candidates that have every skill in `required_skills` (canonical names); rows saved
+    before skill extraction only match once `python db.py skills` has backfilled them.
+    Returns a list of dicts (using cursor(dictionary=True)); compact rows are decoded transparently.
     """
     try:
         conn = get_connection()
@@ -191,16 +401,9 @@ def fetch_resumes(min_score=0.0, search_name=""):
             print("❌ No DB connection available for fetch.")
             return resumes
         cursor = conn.cursor(dictionary=True)
-        query = "SELECT * FROM shortlisted_resumes WHERE score >= %s"
-        params = [min_score]
-
-        if search_name:
-            query += " AND candidate_name LIKE %s"
-            params.append(f"%{search_name}%")
-
-        query += " ORDER BY score DESC"
-        cursor.execute(query, tuple(params))
-        resumes = cursor.fetchall()
+        query, params = _fetch_query(min_score, search_name, required_skills)
+        cursor.execute(query, params)
+        resumes = [_decode_row(row) for row in cursor.fetchall()]
         cursor.close()
         conn.close()
         return resumes
@@ -210,3 +413,204 @@ def fetch_resumes(min_score=0.0, search_name=""):
     except Exception as e:
         print("❌ Unexpected error fetching resumes:", e)
         return []
+
+def migrate_to_compact(batch_size=200):
+    """
+    Move existing plain rows (resume_text / JSON top_sentences) into the compact layout.
+    Runs in batches so it can be interrupted and re-run safely; returns a byte report
+    for the migrated rows: {"rows", "bytes_before", "bytes_after", "per_candidate_before",
+    "per_candidate_after"}. Shared blobs are counted once.
+    """
+    report = {"rows": 0, "bytes_before": 0, "bytes_after": 0}
+    conn = init_db()
+    if conn is None:
+        print("❌ No DB connection available for migration.")
+        return report
+    try:
+        seen_hashes = set()
+        while True:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(
+                "SELECT id, top_sentences, resume_text FROM shortlisted_resumes "
+                "WHERE resume_hash IS NULL AND resume_text IS NOT NULL LIMIT %s",
+                (int(batch_size),)
+            )
+            rows = cursor.fetchall()
+            cursor.close()
+            if not rows:
+                break
+            cursor = conn.cursor()
+            for row in rows:
+                top = row["top_sentences"]
+                top = json.loads(top) if isinstance(top, (str, bytes, bytearray)) else (top or [])
+                text = row["resume_text"]
+                digest = _store_blob(cursor, text)
+                sentences_blob, scores_blob = storage.encode_top_matches(top)
+                cursor.execute(
+                    "UPDATE shortlisted_resumes SET resume_hash = %s, top_sentences_blob = %s, "
+                    "top_scores = %s, top_sentences = NULL, resume_text = NULL WHERE id = %s",
+                    (digest, sentences_blob, scores_blob, row["id"])
+                )
+                report["rows"] += 1
+                report["bytes_before"] += storage.plain_row_bytes(top, text)
+                report["bytes_after"] += len(digest) + len(sentences_blob) + len(scores_blob)
+                if digest not in seen_hashes:
+                    seen_hashes.add(digest)
+                    report["bytes_after"] += len(storage.encode_text(text))
+            conn.commit()
+            cursor.close()
+            print(f"✅ Migrated {report['rows']} rows so far.")
+    except Exception as e:
+        print("❌ Error migrating resumes:", e)
+    finally:
+        conn.close()
+    rows = max(report["rows"], 1)
+    report["per_candidate_before"] = report["bytes_before"] / rows
+    report["per_candidate_after"] = report["bytes_after"] / rows
+    return report
+
+def backfill_skills(batch_size=200):
+    """
+    Extract skills/sections for rows stored before skill extraction existed (skills IS NULL)
+    and fill resume_skills for them, so required_skills filters cover old candidates too.
+    Batched by id, so it can be interrupted and re-run. Returns the number of rows updated.
+    """
+    updated = 0
+    conn = init_db()
+    if conn is None:
+        print("❌ No DB connection available for skills backfill.")
+        return updated
+    try:
+        last_id = 0
+        while True:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(
+                "SELECT s.id, s.candidate_name, s.resume_text, b.text_blob FROM shortlisted_resumes s "
+                "LEFT JOIN resume_blobs b ON b.content_hash = s.resume_hash "
+                "WHERE s.skills IS NULL AND s.id > %s ORDER BY s.id LIMIT %s",
+                (last_id, int(batch_size))
+            )
+            rows = cursor.fetchall()
+            cursor.close()
+            if not rows:
+                break
+            cursor = conn.cursor()
+            for row in rows:
+                last_id = row["id"]
+                text = _decode_row(row).get("resume_text") or ""
+                profile = skills.extract_profile(text)
+                cursor.execute(
+                    "UPDATE shortlisted_resumes SET skills = %s, sections = %s WHERE id = %s",
+                    (_json_or_none(profile["skills"]), _json_or_none(profile["sections"]), row["id"])
+                )
+                cursor.execute(_DELETE_SKILLS_SQL, (row["candidate_name"],))
+                if profile["skills"]:
+                    cursor.executemany(_INSERT_SKILL_SQL, _skill_rows(row["candidate_name"], profile["skills"]))
+                updated += 1
+            conn.commit()
+            cursor.close()
+            print(f"✅ Extracted skills for {updated} rows so far.")
+    except Exception as e:
+        print("❌ Error backfilling skills:", e)
+    finally:
+        conn.close()
+    return updated
+
+# Blobs no row points at any more (the candidate's resume text changed on upsert). The grace
+# period keeps a blob that an insert has just stored but not yet committed a row for.
+_ORPHAN_BLOBS_WHERE = """
+    FROM resume_blobs b
+    LEFT JOIN shortlisted_resumes s ON s.resume_hash = b.content_hash
+    WHERE s.id IS NULL AND b.created_at < NOW() - INTERVAL %s MINUTE
+"""
+
+def gc_blobs(grace_minutes=60):
+    """
+    Delete resume_blobs rows that no shortlisted_resumes row references.
+    Returns {"blobs": rows deleted, "bytes": stored bytes freed}.
+    """
+    report = {"blobs": 0, "bytes": 0}
+    conn = get_connection()
+    if not conn:
+        print("❌ No DB connection available for blob cleanup.")
+        return report
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(b.text_blob)), 0) " + _ORPHAN_BLOBS_WHERE, (int(grace_minutes),)
+        )
+        _, freed = cursor.fetchone()
+        cursor.execute("DELETE b " + _ORPHAN_BLOBS_WHERE, (int(grace_minutes),))
+        report["blobs"] = cursor.rowcount
+        report["bytes"] = int(freed or 0) if cursor.rowcount else 0
+        conn.commit()
+        cursor.close()
+    except Exception as e:
+        print("❌ Error cleaning up resume blobs:", e)
+    finally:
+        conn.close()
+    return report
+
+def storage_report():
+    """
+    Current average payload bytes per candidate, split by layout. Compact rows include
+    their share of resume_blobs (each distinct blob counted once).
+    """
+    conn = get_connection()
+    if not conn:
+        print("❌ No DB connection available for storage report.")
+        return {}
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT
+                SUM(resume_hash IS NULL),
+                COALESCE(SUM(CASE WHEN resume_hash IS NULL
+                    THEN COALESCE(LENGTH(resume_text), 0) + COALESCE(LENGTH(top_sentences), 0) END), 0),
+                SUM(resume_hash IS NOT NULL),
+                COALESCE(SUM(CASE WHEN resume_hash IS NOT NULL
+                    THEN 64 + COALESCE(LENGTH(top_sentences_blob), 0) + COALESCE(LENGTH(top_scores), 0) END), 0)
+            FROM shortlisted_resumes
+        """)
+        plain_rows, plain_bytes, compact_rows, compact_bytes = (int(v or 0) for v in cursor.fetchone())
+        cursor.execute("""
+            SELECT COALESCE(SUM(LENGTH(b.text_blob)), 0), COALESCE(SUM(b.raw_bytes), 0)
+            FROM resume_blobs b
+            WHERE EXISTS (SELECT 1 FROM shortlisted_resumes s WHERE s.resume_hash = b.content_hash)
+        """)
+        blob_bytes, blob_raw_bytes = (int(v or 0) for v in cursor.fetchone())
+        cursor.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(b.text_blob)), 0) " + _ORPHAN_BLOBS_WHERE, (0,))
+        orphan_blobs, orphan_bytes = (int(v or 0) for v in cursor.fetchone())
+        cursor.close()
+        compact_bytes += blob_bytes
+        return {
+            "plain_rows": plain_rows,
+            "plain_bytes_per_candidate": plain_bytes / plain_rows if plain_rows else 0.0,
+            "compact_rows": compact_rows,
+            "compact_bytes_per_candidate": compact_bytes / compact_rows if compact_rows else 0.0,
+            "compact_text_ratio": blob_bytes / blob_raw_bytes if blob_raw_bytes else 0.0,
+            "orphan_blobs": orphan_blobs,
+            "orphan_blob_bytes": orphan_bytes,
+        }
+    except Exception as e:
+        print("❌ Error building storage report:", e)
+        return {}
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    # `python db.py migrate` converts legacy rows; `python db.py skills` extracts skills for rows
+    # saved without them; `python db.py gc` deletes unreferenced blobs; `python db.py report` prints sizes only.
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == "skills":
+        print(f"Extracted skills for {backfill_skills()} rows.")
+    if len(sys.argv) > 1 and sys.argv[1] == "gc":
+        result = gc_blobs()
+        print(f"Deleted {result['blobs']} unreferenced blobs ({result['bytes']} bytes).")
+    if len(sys.argv) > 1 and sys.argv[1] == "migrate":
+        result = migrate_to_compact()
+        print(
+            f"Migrated {result['rows']} rows: "
+            f"{result['per_candidate_before']:.0f} -> {result['per_candidate_after']:.0f} bytes per candidate"
+        )
+    print("Storage report:", json.dumps(storage_report(), indent=2))
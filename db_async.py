@@ -0,0 +1,333 @@
+# db_async.py — asyncio MySQL access layer (aiomysql pool) with the same surface as db.py
+import os
+import ssl
+import heapq
+import asyncio
+import threading
+import concurrent.futures
+import aiomysql
+import db
+import storage
+from db import DB_CONFIG
+
+# Pool sizing and timeouts (seconds); all overridable from .env like the connection settings
+POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN", 1))
+POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX", 5))
+CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", 10))
+QUERY_TIMEOUT = float(os.getenv("DB_QUERY_TIMEOUT", 15))
+
+_pool = None
+_pool_lock = None
+
+def _connect_args():
+    """
+    aiomysql keyword arguments built from DB_CONFIG. The Aiven CA file becomes an
+    SSLContext because aiomysql does not accept a bare `ssl_ca` path.
+    """
+    args = {
+        "host": DB_CONFIG.get("host", "localhost"),
+        "port": int(DB_CONFIG.get("port", 3306)),
+        "user": DB_CONFIG.get("user", "root"),
+        "password": DB_CONFIG.get("password", ""),
+        "connect_timeout": CONNECT_TIMEOUT,
+        "charset": "utf8mb4",
+        # Reads then leave no open transaction, so Pool.release keeps the connection instead
+        # of closing it; writes open one explicitly with conn.begin()
+        "autocommit": True
+    }
+    if DB_CONFIG.get("database"):
+        args["db"] = DB_CONFIG.get("database")
+    if DB_CONFIG.get("ssl_ca"):
+        args["ssl"] = ssl.create_default_context(cafile=DB_CONFIG.get("ssl_ca"))
+    return args
+
+async def get_pool():
+    """
+    Return the shared pool for the running event loop, creating it on first use.
+    A pool is bound to the loop it was created on; use AsyncWriter to share one
+    across Streamlit script threads.
+    """
+    global _pool, _pool_lock
+    if _pool_lock is None:
+        _pool_lock = asyncio.Lock()
+    async with _pool_lock:
+        if _pool is None or _pool.closed:
+            _pool = await aiomysql.create_pool(
+                minsize=POOL_MIN_SIZE, maxsize=POOL_MAX_SIZE, pool_recycle=3600, **_connect_args()
+            )
+    return _pool
+
+async def close_pool():
+    """Close the shared pool and wait for its connections to be released."""
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        await _pool.wait_closed()
+        _pool = None
+
+async def _run(work, timeout=None):
+    """
+    Run `work(conn)` on a pooled connection with a query timeout. On timeout or
+    cancellation the connection is closed rather than returned, so a half-read
+    result set is never handed to the next caller.
+    """
+    pool = await get_pool()
+    conn = await asyncio.wait_for(pool.acquire(), CONNECT_TIMEOUT)
+    try:
+        return await asyncio.wait_for(work(conn), QUERY_TIMEOUT if timeout is None else timeout)
+    except (asyncio.CancelledError, asyncio.TimeoutError):
+        conn.close()
+        raise
+    finally:
+        pool.release(conn)
+
+async def init_db():
+    """
+    Ensure the database and tables exist (creating the database if missing).
+    Returns True on success; unlike db.init_db no connection is handed back,
+    callers go through the pool.
+    """
+    try:
+        await get_pool()
+    except aiomysql.OperationalError as e:
+        if e.args and e.args[0] == 1049:
+            print("⚠️ Database not found. Attempting to create it...")
+            if not await asyncio.to_thread(db._create_database_if_missing):
+                return False
+        else:
+            print("❌ Error while connecting to MySQL:", e)
+            return False
+
+    async def work(conn):
+        async with conn.cursor() as cursor:
+            await cursor.execute(db._CREATE_RESUMES_SQL)
+            await cursor.execute(db._CREATE_BLOBS_SQL)
+            await cursor.execute(db._CREATE_SKILLS_SQL)
+            await cursor.execute(db._COLUMNS_SQL)
+            existing = {row[0] for row in await cursor.fetchall()}
+            for statement in db._added_column_ddl(existing):
+                await cursor.execute(statement)
+                print("✅ Schema updated:", statement)
+        await conn.commit()
+
+    try:
+        await _run(work)
+        print("✅ Tables 'shortlisted_resumes', 'resume_blobs' and 'resume_skills' ensured (async).")
+        return True
+    except Exception as e:
+        print("❌ Error ensuring tables exist:", e)
+        return False
+
+async def insert_resume(candidate_name, file_name, score, best_sentence_score, top_sentences, resume_text,
+                        skills=None, sections=None):
+    """
+    Async insert-or-update of a shortlisted resume entry (same storage modes as db.insert_resume).
+    Returns True if a new row was created, False if an existing one was updated, None on
+    error. Errors are printed, not raised; cancellation propagates.
+    """
+    async def work(conn):
+        await conn.begin()  # blob, row and skill rows commit together
+        async with conn.cursor() as cursor:
+            if db.STORAGE_MODE == "compact":
+                digest = storage.content_hash(resume_text)
+                if await cursor.execute(db._TOUCH_BLOB_SQL, (digest,)) < 1:
+                    await cursor.execute(db._INSERT_BLOB_SQL, db._blob_params(digest, resume_text))
+                rows = await cursor.execute(db._INSERT_COMPACT_SQL, db._compact_params(
+                    candidate_name, file_name, score, best_sentence_score, top_sentences, digest, skills, sections
+                ))
+            else:
+                rows = await cursor.execute(db._INSERT_PLAIN_SQL, db._plain_params(
+                    candidate_name, file_name, score, best_sentence_score, top_sentences, resume_text, skills, sections
+                ))
+            if skills is not None:
+                await cursor.execute(db._DELETE_SKILLS_SQL, (candidate_name,))
+                if skills:
+                    await cursor.executemany(db._INSERT_SKILL_SQL, db._skill_rows(candidate_name, skills))
+        await conn.commit()
+        # ON DUPLICATE KEY UPDATE reports 1 affected row for an insert, 2 for an update
+        return rows == 1
+
+    try:
+        return await _run(work)
+    except asyncio.CancelledError:
+        raise
+    except asyncio.TimeoutError:
+        print("❌ Timed out inserting resume:", candidate_name)
+    except Exception as e:
+        print("❌ Error inserting resume:", e)
+    return None
+
+async def delete_resume(candidate_name):
+    """
+    Delete a shortlisted resume entry and its skill rows (its blob is left for db.gc_blobs).
+    Errors are printed, not raised; cancellation propagates.
+    """
+    async def work(conn):
+        await conn.begin()
+        async with conn.cursor() as cursor:
+            await cursor.execute(db._DELETE_SKILLS_SQL, (candidate_name,))
+            await cursor.execute(db._DELETE_RESUME_SQL, (candidate_name,))
+        await conn.commit()
+
+    try:
+        await _run(work)
+    except asyncio.CancelledError:
+        raise
+    except asyncio.TimeoutError:
+        print("❌ Timed out deleting resume:", candidate_name)
+    except Exception as e:
+        print("❌ Error deleting resume:", e)
+
+async def _delete_if_created(insert_future, candidate_name):
+    """Once `insert_future` finishes, delete its row if that insert created it."""
+    try:
+        created = await asyncio.wrap_future(insert_future)
+    except asyncio.CancelledError:
+        if not insert_future.cancelled():
+            raise
+        return
+    if created:
+        await delete_resume(candidate_name)
+
+async def fetch_resumes(min_score=0.0, search_name="", required_skills=None):
+    """
+    Async version of db.fetch_resumes: list of dicts with compact rows decoded.
+    Returns [] on error or timeout.
+    """
+    async def work(conn):
+        async with conn.cursor(aiomysql.DictCursor) as cursor:
+            query, params = db._fetch_query(min_score, search_name, required_skills)
+            await cursor.execute(query, params)
+            return [db._decode_row(dict(row)) for row in await cursor.fetchall()]
+
+    try:
+        return await _run(work)
+    except asyncio.CancelledError:
+        raise
+    except asyncio.TimeoutError:
+        print("❌ Timed out fetching resumes.")
+        return []
+    except Exception as e:
+        print("❌ Error fetching resumes:", e)
+        return []
+
+class AsyncWriter:
+    """
+    Owns an event loop on a daemon thread so synchronous code (the Streamlit script,
+    the scoring loop) can queue DB writes and keep computing while they run.
+    `submit_insert` returns immediately; `drain` waits for everything queued so far.
+    """
+
+    def __init__(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="db-async-writer", daemon=True)
+        self._thread.start()
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the writer loop and block for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    def submit(self, coro):
+        """Queue a coroutine on the writer loop; returns a concurrent.futures.Future."""
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._forget)
+        return future
+
+    def submit_insert(self, *args):
+        """Queue an insert_resume(*args) call; returns a concurrent.futures.Future."""
+        return self.submit(insert_resume(*args))
+
+    def _forget(self, future):
+        with self._lock:
+            self._pending.discard(future)
+
+    def drain(self, futures=None, timeout=None):
+        """
+        Wait for `futures` (as returned by submit_insert) or, if None, for every write
+        queued on this writer. The writer is shared across sessions, so a run should pass
+        its own futures. `timeout` bounds the whole wait; writes still running after it
+        are cancelled. Returns the exceptions raised by failed or cancelled writes.
+        """
+        if futures is None:
+            with self._lock:
+                futures = list(self._pending)
+        done, not_done = concurrent.futures.wait(futures, timeout)
+        errors = []
+        for future in not_done:
+            future.cancel()
+            errors.append(asyncio.TimeoutError(f"DB write still running after {timeout}s; cancelled"))
+        for future in done:
+            if future.cancelled():
+                errors.append(asyncio.CancelledError())
+            elif future.exception() is not None:
+                errors.append(future.exception())
+        return errors
+
+    def close(self):
+        """Drain, close the pool and stop the loop thread."""
+        self.drain()
+        self.run(close_pool())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+class ShortlistSaver:
+    """
+    Keeps one run's provisional Top K in the database while scoring continues. A result
+    that enters the running Top K is written straight away, overlapping with encoding
+    the next resume; one pushed out again is deleted if this run created its row (a row
+    an earlier run saved is kept, with this run's values). Ties keep the earlier
+    result, as scoring.rank_results does, so the rows this run leaves are its Top K.
+    """
+
+    def __init__(self, writer, top_k, score_threshold):
+        self.writer = writer
+        self.top_k = int(top_k)
+        self.score_threshold = score_threshold
+        self.futures = []  # everything submitted, for AsyncWriter.drain
+        self._heap = []  # (score, -arrival, record, insert future or None)
+        self._arrivals = 0
+
+    def _admit(self, record):
+        # -> True if `record` (db_record tuple) enters the running Top K
+        score = record[2]
+        if self.top_k < 1 or score < self.score_threshold:
+            return False
+        self._arrivals += 1
+        key = (score, -self._arrivals)
+        if len(self._heap) < self.top_k:
+            return key
+        if key <= self._heap[0][:2]:
+            return False
+        _, _, evicted, future = heapq.heappop(self._heap)
+        if future is not None:
+            self.futures.append(self.writer.submit(_delete_if_created(future, evicted[0])))
+        return key
+
+    def offer(self, record):
+        """Write `record` if it enters the running Top K (evicting and deleting the weakest)."""
+        key = self._admit(record)
+        if key:
+            future = self.writer.submit_insert(*record)
+            self.futures.append(future)
+            heapq.heappush(self._heap, key + (record, future))
+
+    def seed(self, record):
+        """
+        Add a result an earlier, interrupted worker already scored. It is not written
+        now (and never deleted); call `write_seeded` at the end to upsert the ones still
+        in the Top K.
+        """
+        key = self._admit(record)
+        if key:
+            heapq.heappush(self._heap, key + (record, None))
+
+    def write_seeded(self):
+        for i, (score, arrival, record, future) in enumerate(self._heap):
+            if future is None:
+                future = self.writer.submit_insert(*record)
+                self.futures.append(future)
+                self._heap[i] = (score, arrival, record, future)
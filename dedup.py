@@ -0,0 +1,107 @@
+# dedup.py — exact + near-duplicate resume detection (SHA-256 and MinHash/LSH) before scoring
+import os
+import re
+import zlib
+import hashlib
+import numpy as np
+
+NUM_PERM = 128
+BANDS = 32  # 32 bands x 4 rows: pairs above ~0.45 Jaccard become LSH candidates
+SHINGLE_SIZE = 3
+NEAR_DUP_THRESHOLD = float(os.getenv("RM_NEAR_DUP_THRESHOLD", 0.9))
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+# Fixed seed so signatures are comparable across processes (app and job workers)
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+
+_TOKEN_RE = re.compile(r"\w+")
+
+def normalize(text):
+    """Lowercased word tokens; formatting, punctuation and whitespace differences are ignored."""
+    return _TOKEN_RE.findall((text or "").lower())
+
+def exact_hash(text):
+    """SHA-256 hex digest of the normalized text (same resume re-exported -> same hash)."""
+    return hashlib.sha256(" ".join(normalize(text)).encode("utf-8")).hexdigest()
+
+def minhash(text):
+    """
+    MinHash signature (NUM_PERM uint64 values) over word SHINGLE_SIZE-grams.
+    The fraction of equal positions between two signatures estimates their Jaccard similarity.
+    """
+    tokens = normalize(text)
+    if len(tokens) > SHINGLE_SIZE:
+        shingles = {" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+    else:
+        shingles = {" ".join(tokens)}
+    hv = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+    # (a*x + b) mod p, truncated to 32 bits; uint64 wrap-around is intended
+    phv = ((np.outer(hv, _PERM_A) + _PERM_B) % _MERSENNE_PRIME) & _MAX_HASH
+    return phv.min(axis=0)
+
+def fingerprint(text):
+    """(exact hash, MinHash signature) for one extracted resume."""
+    return exact_hash(text), minhash(text)
+
+def signature_to_bytes(signature):
+    return np.asarray(signature, dtype="<u8").tobytes()
+
+def signature_from_bytes(blob):
+    return np.frombuffer(bytes(blob), dtype="<u8").astype(np.uint64)
+
+class DuplicateIndex:
+    """
+    Incremental duplicate index. Feed resumes in upload order with `add`; the first
+    copy seen becomes the representative and later exact or near copies map to it,
+    so they can be skipped before any encoding happens.
+    """
+
+    def __init__(self, threshold=NEAR_DUP_THRESHOLD):
+        self.threshold = float(threshold)
+        self._rows = NUM_PERM // BANDS
+        self._exact = {}
+        self._buckets = {}
+        self._signatures = {}
+
+    def _band_keys(self, signature):
+        for band in range(BANDS):
+            chunk = signature[band * self._rows:(band + 1) * self._rows]
+            yield band, chunk.tobytes()
+
+    def add(self, key, digest, signature):
+        """
+        Register an item. Returns the key of the earlier item it duplicates, or None
+        if it is new (in which case it becomes a representative for later items).
+        """
+        if digest in self._exact:
+            return self._exact[digest]
+        if self.threshold < 1.0:
+            candidates = set()
+            for band_key in self._band_keys(signature):
+                candidates.update(self._buckets.get(band_key, ()))
+            best, best_sim = None, self.threshold
+            for other in candidates:
+                sim = float(np.mean(self._signatures[other] == signature))
+                if sim >= best_sim:
+                    best, best_sim = other, sim
+            if best is not None:
+                return best
+            for band_key in self._band_keys(signature):
+                self._buckets.setdefault(band_key, []).append(key)
+            self._signatures[key] = signature
+        self._exact[digest] = key
+        return None
+
+def attach_duplicates(results_by_key, duplicate_pairs):
+    """
+    Group collapsed copies under their representative result as `duplicates` (list of names).
+    `duplicate_pairs` is an iterable of (duplicate name, representative key).
+    """
+    for name, rep_key in duplicate_pairs:
+        rep = results_by_key.get(rep_key)
+        if rep is not None:
+            rep.setdefault("duplicates", []).append(name)
+    return results_by_key
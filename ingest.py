@@ -0,0 +1,288 @@
+# ingest.py — bounded-memory upload ingestion: spool to temp files, extract text, release
+import os
+import io
+import mmap
+import shutil
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import PyPDF2, docx, pdfplumber
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MB = 1024 * 1024
+CHUNK_SIZE = 1 * MB
+
+# Bytes of spooled files allowed to be extracting at once, and total bytes accepted per batch
+MAX_INFLIGHT_BYTES = int(os.getenv("RM_MAX_INFLIGHT_MB", 32)) * MB
+MAX_BATCH_BYTES = int(os.getenv("RM_MAX_BATCH_MB", 300)) * MB
+EXTRACT_WORKERS = int(os.getenv("RM_EXTRACT_WORKERS", 2))
+
+SUPPORTED_EXTENSIONS = ("pdf", "docx", "txt")
+
+class ByteBudget:
+    """
+    Counting semaphore over bytes. `acquire(n)` blocks while another n bytes would
+    exceed the limit; a single item larger than the whole limit is still admitted
+    once nothing else is in flight, so it cannot deadlock the batch.
+    """
+
+    def __init__(self, limit):
+        self.limit = int(limit)
+        self.used = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, n):
+        with self._cond:
+            while self.used and self.used + n > self.limit:
+                self._cond.wait()
+            self.used += n
+
+    def release(self, n):
+        with self._cond:
+            self.used = max(0, self.used - n)
+            self._cond.notify_all()
+
+def upload_size(uploaded_file):
+    """Size in bytes of a Streamlit UploadedFile (or any seekable file object), or None."""
+    try:
+        return uploaded_file.size
+    except Exception:
+        try:
+            pos = uploaded_file.tell()
+            uploaded_file.seek(0, io.SEEK_END)
+            size = uploaded_file.tell()
+            uploaded_file.seek(pos)
+            return size
+        except Exception:
+            return None
+
+def spool_upload(uploaded_file, directory=None):
+    """
+    Copy an upload to a temp file in CHUNK_SIZE pieces (never a whole-file `read()`).
+    Returns the temp path; the caller owns it and must delete it.
+    """
+    name = getattr(uploaded_file, "name", None) or "unknown_resume"
+    suffix = "." + name.split(".")[-1].lower() if "." in name else ""
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            try:
+                uploaded_file.seek(0)
+            except Exception:
+                pass
+            shutil.copyfileobj(uploaded_file, out, CHUNK_SIZE)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+def _open_mmap(path):
+    """Read-only memory map of `path`, or None for an empty file (mmap rejects length 0)."""
+    if os.path.getsize(path) == 0:
+        return None
+    with open(path, "rb") as fh:
+        return mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+def extract_text_from_pdf(path):
+    """Extract PDF text page by page from a memory-mapped file (PyPDF2 as fallback)."""
+    text = ""
+    mm = _open_mmap(path)
+    if mm is None:
+        return text
+    try:
+        try:
+            with pdfplumber.open(mm) as pdf:
+                for page in pdf.pages:
+                    page_text = page.extract_text()
+                    if page_text:
+                        text += page_text + "\n"
+                    # drop per-page layout caches so memory stays flat on long PDFs
+                    page.flush_cache()
+        except Exception:
+            mm.seek(0)
+            reader = PyPDF2.PdfReader(mm)
+            for p in reader.pages:
+                page_text = p.extract_text()
+                if page_text:
+                    text += page_text + "\n"
+    finally:
+        mm.close()
+    return text
+
+def extract_text_from_docx(path):
+    d = docx.Document(path)
+    return "".join(p.text + "\n" for p in d.paragraphs if p.text)
+
+def extract_text_from_txt(path):
+    mm = _open_mmap(path)
+    if mm is None:
+        return ""
+    try:
+        return str(mm[:], "utf-8", errors="ignore")
+    finally:
+        mm.close()
+
+_EXTRACTORS = {
+    "pdf": extract_text_from_pdf,
+    "docx": extract_text_from_docx,
+    "txt": extract_text_from_txt,
+}
+
+def extract_text(path, name):
+    """
+    Extract text from a spooled file. Returns (text, error) where error is None
+    on success or a short message suitable for a UI warning.
+    """
+    ext = name.split(".")[-1].lower()
+    extractor = _EXTRACTORS.get(ext)
+    if extractor is None:
+        return "", f"Unsupported format: {name}"
+    try:
+        return extractor(path).strip(), None
+    except Exception as e:
+        return "", f"{ext.upper()} parsing error in {name}: {e}"
+
+def _extract_and_release(path, name, size, budget):
+    try:
+        text, error = extract_text(path, name)
+    finally:
+        try:
+            os.remove(path)
+        except Exception:
+            pass
+        budget.release(size)
+    return name, text, error
+
+def iter_extracted(uploaded_files, max_inflight_bytes=MAX_INFLIGHT_BYTES,
+                   max_batch_bytes=MAX_BATCH_BYTES, workers=EXTRACT_WORKERS):
+    """
+    Yield (name, text, error) for each upload, in upload order.
+
+    Each file is spooled to disk and extracted on a small thread pool. At most
+    `max_inflight_bytes` of spooled input are being extracted at once; the loop
+    blocks (back-pressure) until earlier files finish and their temp files are
+    deleted. Files past the cumulative `max_batch_bytes` budget are skipped with
+    an error instead of being read at all.
+    """
+    budget = ByteBudget(max_inflight_bytes)
+    accepted = 0
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max(1, int(workers)), thread_name_prefix="extract") as pool:
+        for f in uploaded_files:
+            name = getattr(f, "name", None) or "unknown_resume"
+            size = upload_size(f) or 0
+            if max_batch_bytes and accepted + size > max_batch_bytes:
+                pending.append((name, "", f"{name} skipped: batch budget of {max_batch_bytes / MB:.0f} MB exceeded."))
+            else:
+                accepted += size
+                budget.acquire(size)
+                try:
+                    path = spool_upload(f)
+                except Exception as e:
+                    budget.release(size)
+                    pending.append((name, "", f"Could not read {name}: {e}"))
+                else:
+                    pending.append(pool.submit(_extract_and_release, path, name, size, budget))
+            while pending and (isinstance(pending[0], tuple) or pending[0].done()):
+                head = pending.popleft()
+                yield head if isinstance(head, tuple) else head.result()
+        while pending:
+            head = pending.popleft()
+            yield head if isinstance(head, tuple) else head.result()
+
+def peak_rss_mb():
+    """
+    Lifetime peak resident set size of this process in MB (None where `resource` is
+    unavailable). In the long-running Streamlit server this covers every past run;
+    use RssMonitor to measure one run.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return peak / MB if os.uname().sysname == "Darwin" else peak / 1024
+
+def current_rss_mb():
+    """Current resident set size of this process in MB, from /proc (None off Linux)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / MB
+
+class RssMonitor:
+    """
+    Samples current RSS on a background thread while in use (`with RssMonitor() as m:`).
+    `baseline_mb` is the RSS at entry and `peak_mb` the highest sample, so
+    `delta_mb` is how far this run pushed memory above where it started. Values
+    are None where current RSS cannot be read. RSS is per process, so concurrent
+    sessions in the same server still add to the samples.
+    """
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.baseline_mb = None
+        self.peak_mb = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        rss = current_rss_mb()
+        if rss is not None and (self.peak_mb is None or rss > self.peak_mb):
+            self.peak_mb = rss
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self.baseline_mb = current_rss_mb()
+        self.peak_mb = self.baseline_mb
+        if self.baseline_mb is not None:
+            self._thread = threading.Thread(target=self._loop, name="rss-monitor", daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._sample()
+        return False
+
+    @property
+    def delta_mb(self):
+        if self.baseline_mb is None or self.peak_mb is None:
+            return None
+        return self.peak_mb - self.baseline_mb
+
+if __name__ == "__main__":
+    # `python ingest.py FILE...` — extract files through the bounded path and report peak RSS.
+    import sys
+    import time
+
+    class _LocalUpload(io.FileIO):
+        @property
+        def size(self):
+            return os.path.getsize(self.name)
+
+    paths = sys.argv[1:]
+    started = time.perf_counter()
+    uploads = (_LocalUpload(p) for p in paths)
+    total_chars = 0
+    with RssMonitor() as monitor:
+        for name, text, error in iter_extracted(uploads):
+            if error:
+                print("⚠️", error)
+            total_chars += len(text)
+    print(f"Extracted {total_chars} chars from {len(paths)} files in {time.perf_counter() - started:.2f}s")
+    if monitor.delta_mb is not None:
+        print(f"RSS {monitor.baseline_mb:.1f} MB at start, peak {monitor.peak_mb:.1f} MB (+{monitor.delta_mb:.1f} MB)")
+    else:
+        print(f"Peak RSS {peak_rss_mb():.1f} MB (process lifetime)")
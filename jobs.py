@@ -0,0 +1,490 @@
+# jobs.py — SQLite-backed local job queue for large Analyze runs (no external broker)
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import sqlite3
+import subprocess
+import storage
+from ingest import spool_upload, upload_size, extract_text, MAX_BATCH_BYTES, MB
+from dedup import (DuplicateIndex, fingerprint, signature_to_bytes, signature_from_bytes,
+                   attach_duplicates, NEAR_DUP_THRESHOLD)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+JOBS_DIR = os.getenv("RM_JOBS_DIR", os.path.join(HERE, ".jobs"))
+JOBS_DB = os.path.join(JOBS_DIR, "jobs.sqlite3")
+
+# Job lifecycle: queued -> running -> done | failed | cancelled
+# Item lifecycle: pending -> done | duplicate | filtered | pruned | error
+ACTIVE_STATUSES = ("queued", "running")
+FINAL_STATUSES = ("done", "failed", "cancelled")
+
+# Finished jobs (rows, results and their directory) are purged after this many days
+RETENTION_DAYS = float(os.getenv("RM_JOB_RETENTION_DAYS", 7))
+
+# Columns added after the first release of the job store: (table, column, type)
+_ADDED_COLUMNS = (
+    ("jobs", "near_dup_threshold", "REAL"),
+    ("job_items", "digest", "TEXT"),
+    ("job_items", "signature", "BLOB"),
+    ("jobs", "prune_ratio", "REAL"),
+    ("jobs", "top_k", "INTEGER"),
+    ("jobs", "prefiltered", "INTEGER"),
+    ("job_items", "text_blob", "BLOB"),
+    ("jobs", "required_skills", "TEXT"),
+    ("jobs", "save_as_scored", "INTEGER"),
+)
+
+# A queued job whose worker has not claimed it within this many seconds is relaunched
+START_GRACE_SECONDS = 60
+
+def _connect():
+    """
+    Open the queue database (created on first use). WAL mode lets the UI poll
+    progress while a worker is committing checkpoints.
+    """
+    os.makedirs(JOBS_DIR, exist_ok=True)
+    conn = sqlite3.connect(JOBS_DB, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            jd_text TEXT NOT NULL,
+            model_name TEXT NOT NULL,
+            score_threshold REAL NOT NULL,
+            total INTEGER NOT NULL,
+            worker_pid INTEGER,
+            error TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS job_items (
+            job_id TEXT NOT NULL,
+            idx INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            path TEXT,
+            status TEXT NOT NULL,
+            result TEXT,
+            error TEXT,
+            PRIMARY KEY (job_id, idx)
+        );
+    """)
+    for table, column, ddl in _ADDED_COLUMNS:
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+    return conn
+
+def _job_dir(job_id):
+    return os.path.join(JOBS_DIR, job_id)
+
+def create_job(uploaded_files, jd_text, model_name, score_threshold, max_batch_bytes=MAX_BATCH_BYTES,
+               near_dup_threshold=NEAR_DUP_THRESHOLD, prune_ratio=0.0, top_k=10, required_skills=None,
+               save_as_scored=False):
+    """
+    Spool every upload into the job's directory and queue one item per file.
+    Files past `max_batch_bytes` are recorded as errored items, not spooled.
+    Resumes missing any of `required_skills` (canonical names) are filtered out unscored.
+    Only the final top_k shortlist is saved to MySQL unless `save_as_scored` is set.
+    Returns the new job id; call `start_worker` to run it.
+    """
+    job_id = uuid.uuid4().hex
+    os.makedirs(_job_dir(job_id), exist_ok=True)
+    items = []
+    accepted = 0
+    for idx, f in enumerate(uploaded_files, start=1):
+        name = getattr(f, "name", None) or "unknown_resume"
+        size = upload_size(f) or 0
+        if max_batch_bytes and accepted + size > max_batch_bytes:
+            items.append((job_id, idx, name, None, "error", None,
+                          f"{name} skipped: batch budget of {max_batch_bytes / MB:.0f} MB exceeded.", None, None))
+            continue
+        accepted += size
+        try:
+            items.append((job_id, idx, name, spool_upload(f, directory=_job_dir(job_id)), "pending",
+                          None, None, None, None))
+        except Exception as e:
+            items.append((job_id, idx, name, None, "error", None, f"Could not read {name}: {e}", None, None))
+
+    now = time.time()
+    conn = _connect()
+    with conn:
+        conn.execute(
+            "INSERT INTO jobs (id, status, jd_text, model_name, score_threshold, near_dup_threshold, "
+            "prune_ratio, top_k, prefiltered, required_skills, save_as_scored, total, created_at, updated_at) "
+            "VALUES (?, 'queued', ?, ?, ?, ?, ?, ?, 0, ?, ?, ?, ?, ?)",
+            (job_id, jd_text, model_name, float(score_threshold), float(near_dup_threshold),
+             float(prune_ratio), int(top_k), json.dumps(list(required_skills or [])), int(bool(save_as_scored)),
+             len(items), now, now)
+        )
+        conn.executemany(
+            "INSERT INTO job_items (job_id, idx, name, path, status, result, error, digest, signature) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", items
+        )
+    conn.close()
+    return job_id
+
+def start_worker(job_id):
+    """
+    Launch a detached worker process for `job_id`; it outlives Streamlit reruns.
+    The worker records its own pid when it claims the job.
+    """
+    log = open(os.path.join(_job_dir(job_id), "worker.log"), "ab")
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, "jobs.py"), job_id],
+        cwd=HERE, stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+        start_new_session=True
+    )
+    log.close()
+    return proc.pid
+
+def _pid_alive(pid):
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+def resume_interrupted_jobs():
+    """
+    Restart queued/running jobs whose worker has died (server restart, crash).
+    The pid swap is a compare-and-set, so concurrent sessions restart a job once.
+    Returns the ids of restarted jobs.
+    """
+    conn = _connect()
+    rows = conn.execute(
+        "SELECT id, status, worker_pid, updated_at FROM jobs WHERE status IN (?, ?)", ACTIVE_STATUSES
+    ).fetchall()
+    restarted = []
+    for row in rows:
+        if row["status"] == "queued" and row["worker_pid"] is None:
+            # just created (or just relaunched); give its worker time to claim it
+            if time.time() - row["updated_at"] < START_GRACE_SECONDS:
+                continue
+        elif _pid_alive(row["worker_pid"]):
+            continue
+        with conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = 'queued', worker_pid = NULL, updated_at = ? "
+                "WHERE id = ? AND status = ? AND worker_pid IS ?",
+                (time.time(), row["id"], row["status"], row["worker_pid"])
+            )
+        if cur.rowcount == 1:
+            start_worker(row["id"])
+            restarted.append(row["id"])
+    conn.close()
+    return restarted
+
+def cancel_job(job_id):
+    """
+    Ask the worker to stop after its current resume; finished items are kept. If no
+    worker is alive to do it on exit, the spooled uploads are deleted here.
+    """
+    conn = _connect()
+    with conn:
+        conn.execute(
+            "UPDATE jobs SET status = 'cancelled', updated_at = ? WHERE id = ? AND status IN (?, ?)",
+            (time.time(), job_id, *ACTIVE_STATUSES)
+        )
+    job = conn.execute("SELECT status, worker_pid FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if job is not None and job["status"] == "cancelled" and not _pid_alive(job["worker_pid"]):
+        _discard_spool(conn, job_id)
+    conn.close()
+
+def _discard_spool(conn, job_id):
+    """
+    Delete the spooled uploads and checkpointed text of items that will never be
+    scored now (the job reached a final status). Scored results are kept.
+    """
+    rows = conn.execute("SELECT path FROM job_items WHERE job_id = ? AND path IS NOT NULL", (job_id,)).fetchall()
+    for row in rows:
+        try:
+            os.remove(row["path"])
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"⚠️ Could not delete spooled upload {row['path']}:", e)
+    with conn:
+        conn.execute("UPDATE job_items SET path = NULL, text_blob = NULL WHERE job_id = ?", (job_id,))
+
+def purge_old_jobs(retention_days=RETENTION_DAYS):
+    """
+    Delete finished jobs last updated more than `retention_days` ago: their rows,
+    results and job directory (spooled uploads, worker log). Returns the purged ids.
+    """
+    cutoff = time.time() - float(retention_days) * 86400
+    conn = _connect()
+    ids = [row["id"] for row in conn.execute(
+        "SELECT id FROM jobs WHERE status IN (?, ?, ?) AND updated_at < ?", (*FINAL_STATUSES, cutoff)
+    )]
+    for job_id in ids:
+        shutil.rmtree(_job_dir(job_id), ignore_errors=True)
+        with conn:
+            conn.execute("DELETE FROM job_items WHERE job_id = ?", (job_id,))
+            conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+    conn.close()
+    return ids
+
+def job_status(job_id):
+    """
+    Job row plus progress counts as a dict:
+    {"id", "status", "total", "done", "errors", "pending", "duplicates", "filtered", "pruned", "error", ...},
+    or None if unknown.
+    """
+    conn = _connect()
+    job = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if job is None:
+        conn.close()
+        return None
+    counts = dict(conn.execute(
+        "SELECT status, COUNT(*) FROM job_items WHERE job_id = ? GROUP BY status", (job_id,)
+    ).fetchall())
+    conn.close()
+    status = dict(job)
+    status.pop("jd_text", None)
+    status["done"] = counts.get("done", 0)
+    status["errors"] = counts.get("error", 0)
+    status["pending"] = counts.get("pending", 0)
+    status["duplicates"] = counts.get("duplicate", 0)
+    status["filtered"] = counts.get("filtered", 0)
+    status["pruned"] = counts.get("pruned", 0)
+    return status
+
+def job_results(job_id):
+    """
+    Result dicts for every finished item (the same shape scoring.score_extracted returns),
+    plus error messages for items that could not be read or scored. Collapsed
+    duplicates are listed under their representative's `duplicates`.
+    """
+    conn = _connect()
+    rows = conn.execute(
+        "SELECT idx, name, status, result, error FROM job_items WHERE job_id = ? ORDER BY idx", (job_id,)
+    ).fetchall()
+    conn.close()
+    results, errors, duplicate_pairs = {}, [], []
+    for row in rows:
+        if row["status"] in ("done", "filtered", "pruned"):
+            results[row["idx"]] = json.loads(row["result"])
+            if row["error"]:
+                errors.append(row["error"])
+        elif row["status"] == "duplicate":
+            duplicate_pairs.append((row["name"], json.loads(row["result"])["duplicate_of"]))
+        elif row["status"] == "error":
+            errors.append(row["error"])
+            results[row["idx"]] = {"name": row["name"], "score": 0.0, "top_matches": [], "error": row["error"]}
+    attach_duplicates(results, duplicate_pairs)
+    return list(results.values()), errors
+
+def run_job(job_id):
+    """
+    Worker entry point. Scores every pending item and checkpoints each result, so a
+    restarted worker skips finished resumes. Resumes missing a required skill are
+    filtered out right after extraction. With a prune ratio, every resume is first
+    extracted (text checkpointed) and the pre-filter drops the weakest share before
+    sentence scoring. The running top_k shortlist is kept in MySQL while the next resume
+    is encoded (or, with save_as_scored, every result above the threshold).
+    """
+    conn = _connect()
+    with conn:
+        # Only a queued job can be claimed, so a duplicate worker exits here
+        cur = conn.execute(
+            "UPDATE jobs SET status = 'running', worker_pid = ?, updated_at = ? WHERE id = ? AND status = 'queued'",
+            (os.getpid(), time.time(), job_id)
+        )
+    if cur.rowcount != 1:
+        print(f"Job {job_id} is not runnable; exiting.")
+        conn.close()
+        return
+    job = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+    writer = None
+    try:
+        # Heavy imports stay here so the UI can import this module cheaply
+        from sentence_transformers import SentenceTransformer
+        from db_async import AsyncWriter, ShortlistSaver
+        from scoring import score_extracted, db_record
+        from skills import extract_profile, missing_skills, filtered_result
+
+        model = SentenceTransformer(job["model_name"])
+        jd_embedding = model.encode(job["jd_text"], convert_to_tensor=True, show_progress_bar=False)
+        try:
+            writer = AsyncWriter()
+        except Exception as e:
+            print("⚠️ DB writer unavailable; results are kept in the job store only:", e)
+
+        # Rebuild the duplicate index from checkpointed items so a resumed job still collapses copies
+        threshold = job["near_dup_threshold"] if job["near_dup_threshold"] is not None else NEAR_DUP_THRESHOLD
+        index = DuplicateIndex(threshold)
+        for seen in conn.execute(
+            "SELECT idx, digest, signature FROM job_items WHERE job_id = ? "
+            "AND status IN ('done', 'pending', 'filtered', 'pruned') "
+            "AND digest IS NOT NULL ORDER BY idx", (job_id,)
+        ):
+            index.add(seen["idx"], seen["digest"], signature_from_bytes(seen["signature"]))
+
+        def cancelled():
+            return conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()["status"] == "cancelled"
+
+        def extract(item):
+            # -> (text, error, digest, signature, representative idx or None)
+            text, error = extract_text(item["path"], item["name"])
+            digest = signature = rep = None
+            if text:
+                digest, signature = fingerprint(text)
+                rep = index.add(item["idx"], digest, signature)
+            return text, error, digest, signature, rep
+
+        def checkpoint(item, status, res, error=None, digest=None, signature=None, text_blob=None):
+            with conn:
+                conn.execute(
+                    "UPDATE job_items SET status = ?, result = ?, error = ?, digest = ?, signature = ?, text_blob = ? "
+                    "WHERE job_id = ? AND idx = ?",
+                    (status, json.dumps(res, ensure_ascii=False) if res is not None else None, error, digest,
+                     signature_to_bytes(signature) if signature is not None else None, text_blob,
+                     job_id, item["idx"])
+                )
+                conn.execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (time.time(), job_id))
+            # The spooled upload goes only once its result (or text) is committed, so an
+            # interrupted worker leaves the file in place for the resumed one
+            if item["path"]:
+                try:
+                    os.remove(item["path"])
+                except FileNotFoundError:
+                    pass
+
+        required_skills = json.loads(job["required_skills"] or "[]")
+
+        def screened_out(item, profile, error, digest, signature):
+            # Hard skill filter: a resume missing a must-have skill is checkpointed and never encoded
+            missing = missing_skills(profile["skills"], required_skills)
+            if missing:
+                checkpoint(item, "filtered", filtered_result(item["name"], missing, profile),
+                           error, digest, signature)
+            return bool(missing)
+
+        def pending_items():
+            return conn.execute(
+                "SELECT idx, name, path, error, digest, signature, text_blob FROM job_items "
+                "WHERE job_id = ? AND status = 'pending' ORDER BY idx", (job_id,)
+            ).fetchall()
+
+        prune_ratio = job["prune_ratio"] or 0.0
+        if prune_ratio > 0 and not job["prefiltered"]:
+            from prefilter import prefilter, load_index, pruned_result
+
+            # Stage 1a: extract + dedup everything, checkpointing the (compressed) text
+            for item in pending_items():
+                if item["text_blob"] is not None:
+                    continue
+                if cancelled():
+                    print(f"Job {job_id} cancelled.")
+                    return
+                text, error, digest, signature, rep = extract(item)
+                if rep is not None:
+                    checkpoint(item, "duplicate", {"duplicate_of": rep}, error, digest, signature)
+                elif text and screened_out(item, extract_profile(text), error, digest, signature):
+                    continue
+                elif not text:
+                    res = score_extracted(jd_embedding, item["name"], text, model)
+                    if error:
+                        res["error"] = error
+                    checkpoint(item, "done", res, error)
+                else:
+                    checkpoint(item, "pending", None, error, digest, signature, storage.encode_text(text))
+
+            # Stage 1b: one document embedding per resume; prune the weakest share in one transaction
+            extracted = pending_items()
+            texts = [storage.decode_text(item["text_blob"]) for item in extracted]
+            keep, drop, stage1, seconds = prefilter(
+                model, job["jd_text"], texts, prune_ratio, min_keep=job["top_k"] or 0,
+                index=load_index(job["model_name"])
+            )
+            with conn:
+                for i in drop:
+                    item = extracted[i]
+                    conn.execute(
+                        "UPDATE job_items SET status = 'pruned', result = ?, text_blob = NULL WHERE job_id = ? AND idx = ?",
+                        (json.dumps(pruned_result(item["name"], stage1[i])), job_id, item["idx"])
+                    )
+                conn.execute("UPDATE jobs SET prefiltered = 1, updated_at = ? WHERE id = ?", (time.time(), job_id))
+            print(f"Pre-filter kept {len(keep)} of {len(texts)} resumes in {seconds:.1f}s.")
+
+        # Stage 2: sentence-level scoring, one checkpoint per resume
+        saver = None
+        if writer is not None and not job["save_as_scored"]:
+            saver = ShortlistSaver(writer, job["top_k"] or 10, job["score_threshold"])
+            # A resumed job starts from the results its earlier worker already checkpointed
+            for row in conn.execute(
+                "SELECT digest, result FROM job_items WHERE job_id = ? AND status = 'done' "
+                "AND digest IS NOT NULL ORDER BY idx", (job_id,)
+            ):
+                res = json.loads(row["result"])
+                saver.seed(db_record(f"{row['digest'][:12]}_{res['name']}", res))
+        for item in pending_items():
+            if cancelled():
+                print(f"Job {job_id} cancelled.")
+                return
+            if item["text_blob"] is not None:
+                text, error, digest = storage.decode_text(item["text_blob"]), item["error"], item["digest"]
+                signature = signature_from_bytes(item["signature"]) if item["signature"] is not None else None
+            else:
+                text, error, digest, signature, rep = extract(item)
+                if rep is not None:
+                    # copy of an earlier resume: no encoding, just point at the representative
+                    checkpoint(item, "duplicate", {"duplicate_of": rep}, error, digest, signature)
+                    continue
+            profile = extract_profile(text) if text else None
+            if profile and screened_out(item, profile, error, digest, signature):
+                continue
+            res = score_extracted(jd_embedding, item["name"], text, model)
+            if profile:
+                res.update(profile)
+            if error:
+                res["error"] = error
+            checkpoint(item, "done", res, error, digest, signature)
+            # Content-hash candidate name: re-runs and resumed jobs upsert instead of duplicating rows
+            if digest and writer is not None:
+                record = db_record(f"{digest[:12]}_{item['name']}", res)
+                if saver is not None:
+                    saver.offer(record)
+                elif res["score"] >= job["score_threshold"]:
+                    writer.submit_insert(*record)
+
+        if saver is not None:
+            saver.write_seeded()
+        if writer is not None:
+            for e in writer.drain(timeout=60):
+                print("❌ DB write failed:", e)
+        with conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'done', updated_at = ? WHERE id = ? AND status = 'running'",
+                (time.time(), job_id)
+            )
+    except Exception as e:
+        with conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? WHERE id = ?",
+                (str(e), time.time(), job_id)
+            )
+        raise
+    finally:
+        if writer is not None:
+            writer.close()
+        status = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()["status"]
+        if status in FINAL_STATUSES:
+            _discard_spool(conn, job_id)
+        conn.close()
+
+if __name__ == "__main__":
+    # `python jobs.py JOB_ID` runs one job (normally launched by start_worker)
+    run_job(sys.argv[1])
@@ -0,0 +1,110 @@
+# prefilter.py — cheap document-level stage that prunes off-role resumes before sentence scoring
+import os
+import math
+import time
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+INDEX_DIR = os.getenv("RM_PREFILTER_DIR", os.path.join(HERE, ".emb_cache"))
+PRUNE_RATIO = float(os.getenv("RM_PRUNE_RATIO", 0.0))
+
+# Softmax temperature for turning centroid cosine similarities into category probabilities
+TEMPERATURE = 0.05
+
+def index_path(model_name, index_dir=INDEX_DIR):
+    return os.path.join(index_dir, f"prefilter_{model_name.replace('/', '__')}.npz")
+
+def _normalize(x):
+    x = np.asarray(x, dtype=np.float32)
+    norms = np.linalg.norm(x, axis=-1, keepdims=True)
+    return x / np.maximum(norms, 1e-12)
+
+class CategoryIndex:
+    """
+    One unit-length centroid per resume Category, built from labelled document
+    embeddings (see `ac.py --build-prefilter`). Used to estimate how likely a
+    resume and the JD belong to the same role family.
+    """
+
+    def __init__(self, categories, centroids):
+        self.categories = list(categories)
+        self.centroids = _normalize(centroids)
+
+    @classmethod
+    def build(cls, embeddings, labels):
+        embeddings = _normalize(embeddings)
+        labels = np.asarray(labels)
+        categories = sorted(set(labels.tolist()))
+        centroids = np.stack([embeddings[labels == c].mean(axis=0) for c in categories])
+        return cls(categories, centroids)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez(path, categories=np.asarray(self.categories, dtype=str), centroids=self.centroids)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        return cls(data["categories"].tolist(), data["centroids"])
+
+    def probabilities(self, embeddings):
+        logits = _normalize(embeddings) @ self.centroids.T / TEMPERATURE
+        logits -= logits.max(axis=-1, keepdims=True)
+        p = np.exp(logits)
+        return p / p.sum(axis=-1, keepdims=True)
+
+def load_index(model_name, index_dir=INDEX_DIR):
+    """The saved CategoryIndex for `model_name`, or None if none has been built."""
+    path = index_path(model_name, index_dir)
+    return CategoryIndex.load(path) if os.path.exists(path) else None
+
+def stage1_scores(model, jd_text, texts, index=None):
+    """
+    One embedding per resume (the model truncates long documents) compared with the
+    JD embedding. With a CategoryIndex the score averages that cosine with the
+    probability that resume and JD fall in the same category.
+    """
+    jd = _normalize(model.encode([jd_text], show_progress_bar=False))
+    docs = _normalize(model.encode(list(texts), show_progress_bar=False))
+    scores = docs @ jd[0]
+    if index is not None:
+        agreement = index.probabilities(docs) @ index.probabilities(jd)[0]
+        scores = 0.5 * scores + 0.5 * agreement
+    return scores
+
+def select(scores, prune_ratio, min_keep=0):
+    """
+    Indices (into `scores`) to keep: the top (1 - prune_ratio) share by stage-1
+    score, but never fewer than `min_keep` so the shortlist can still fill.
+    Returns (keep, pruned) as sorted index lists.
+    """
+    n = len(scores)
+    keep_n = min(n, max(int(min_keep), math.ceil(n * (1.0 - float(prune_ratio)))))
+    order = np.argsort(-np.asarray(scores), kind="stable")
+    return sorted(order[:keep_n].tolist()), sorted(order[keep_n:].tolist())
+
+def prefilter(model, jd_text, texts, prune_ratio, min_keep=0, index=None):
+    """
+    Run stage 1 over `texts` and split them. Returns (keep, pruned, scores, seconds).
+    """
+    started = time.perf_counter()
+    if not texts:
+        return [], [], np.zeros(0), 0.0
+    scores = stage1_scores(model, jd_text, texts, index)
+    keep, pruned = select(scores, prune_ratio, min_keep)
+    return keep, pruned, scores, time.perf_counter() - started
+
+def pruned_result(name, stage1_score):
+    """Result entry for a resume dropped by the pre-filter (ranked below every scored resume)."""
+    return {"name": name, "score": 0.0, "top_matches": [], "pruned": True, "prefilter_score": float(stage1_score)}
+
+def shortlist_recall(full_shortlist_keys, kept_keys):
+    """
+    Share of the shortlist that full scoring of every resume produces which also
+    survived the pre-filter (1.0 = pruning lost nobody who would have been shortlisted).
+    """
+    full_shortlist_keys = list(full_shortlist_keys)
+    if not full_shortlist_keys:
+        return 1.0
+    kept_keys = set(kept_keys)
+    return sum(1 for k in full_shortlist_keys if k in kept_keys) / len(full_shortlist_keys)
@@ -0,0 +1,76 @@
+# scoring.py — sentence-level JD/resume similarity shared by the app and background workers
+import os
+import re
+import nltk
+import numpy as np
+from nltk.tokenize import sent_tokenize
+from sentence_transformers import util
+
+# Local punkt data lives next to the app; worker processes need the same search path
+HERE = os.path.dirname(__file__)
+NLTK_DATA_DIR = os.path.join(HERE, "nltk_data")
+if NLTK_DATA_DIR not in nltk.data.path:
+    nltk.data.path.insert(0, NLTK_DATA_DIR)
+
+# ---------- sentence_split (robust fallback) ----------
+def sentence_split(text):
+    """
+    Prefer NLTK sent_tokenize, but fall back to a regex-based splitter if punkt is missing.
+    Returns a list of non-empty sentence strings with length > 10.
+    """
+    if not isinstance(text, str) or not text.strip():
+        return []
+    try:
+        sents = sent_tokenize(text)
+    except LookupError:
+        parts = re.split(r'(?<=[.!?])\s+', text.strip())
+        sents = [p for p in parts if p]
+    return [s.strip() for s in sents if len(s.strip()) > 10]
+
+def compute_resume_score(jd_embedding, resume_text, model):
+    sents = sentence_split(resume_text)
+    if not sents:
+        return {"score": 0.0, "top_matches": [], "resume_sentences": []}
+    sent_embs = model.encode(sents, convert_to_tensor=True, show_progress_bar=False)
+    cos_scores = util.pytorch_cos_sim(jd_embedding, sent_embs)[0].cpu().numpy()
+    best_idx = int(np.argmax(cos_scores))
+    best_score = float(cos_scores[best_idx])
+    top_n = min(5, len(cos_scores))
+    overall = float(np.mean(sorted(cos_scores, reverse=True)[:top_n]))
+    top_matches_idx = np.argsort(-cos_scores)[:top_n]
+    top_matches = [{"sentence": sents[int(i)], "score": float(cos_scores[int(i)])} for i in top_matches_idx]
+    return {"score": overall, "best_sentence_score": best_score, "top_matches": top_matches, "resume_sentences": sents}
+
+def score_extracted(jd_embedding, name, text, model):
+    """Score one extracted resume; returns the result dict the UI renders (with `name`)."""
+    if not text:
+        return {"name": name, "score": 0.0, "top_matches": [], "error": "no text extracted"}
+    res = compute_resume_score(jd_embedding, text, model)
+    res["name"] = name
+    return res
+
+def rank_results(results, score_threshold, top_k):
+    """
+    Return (all results ranked by score, the shortlisted top_k at or above the threshold).
+    Pre-filtered resumes rank after every scored one. Neither they nor resumes that
+    failed a must-have skill filter are ever shortlisted.
+    """
+    results_sorted = sorted(results, key=lambda x: (not x.get("pruned"), x.get("score", 0.0)), reverse=True)
+    shortlisted = [
+        r for r in results_sorted
+        if r.get("score", 0.0) >= score_threshold and not r.get("pruned") and not r.get("missing_skills")
+    ][:int(top_k)]
+    return results_sorted, shortlisted
+
+def db_record(candidate_name, res):
+    """Positional arguments for insert_resume / AsyncWriter.submit_insert."""
+    return (
+        candidate_name,
+        res['name'],
+        res['score'],
+        res['best_sentence_score'],
+        res['top_matches'],
+        "\n".join(res['resume_sentences']),
+        res.get('skills'),
+        res.get('sections')
+    )
@@ -0,0 +1,230 @@
+# skills.py — skill extraction (precompiled Aho-Corasick automaton over a skills taxonomy) and section detection
+import os
+import re
+import json
+import pickle
+import hashlib
+from collections import deque
+from functools import lru_cache
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TAXONOMY_PATH = os.getenv("RM_SKILLS_TAXONOMY", os.path.join(HERE, "skills_taxonomy.json"))
+CACHE_DIR = os.path.join(HERE, ".cache")
+
+_WS_RE = re.compile(r"\s+")
+
+# What may precede an ambiguous bare name ("Go", "C", "R") for it to count as a list entry
+_LIST_SEPARATORS = ",;/|:(&•·▪"
+_LIST_WORDS = (" and", " or")
+# Bullets that are also hyphens/operators: a list marker only at a line start or before a space
+_BULLETS = "-–*"
+
+class SkillMatcher:
+    """
+    Aho-Corasick automaton over every skill name and synonym (lowercased). One pass
+    over the text finds all of them, so cost is linear in the resume length no matter
+    how large the taxonomy is. Matches must sit on word boundaries ("java" does not
+    match inside "javascript"). Ambiguous names ("Go", "C", "R") also match bare, but
+    only in the context `_ambiguous_ok` accepts.
+    """
+
+    def __init__(self, taxonomy):
+        self.skills = sorted(taxonomy["skills"])
+        ambiguous = set(taxonomy.get("ambiguous", []))
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        self._patterns = []  # (pattern, canonical, needs context)
+        for canonical, aliases in taxonomy["skills"].items():
+            self._add(_WS_RE.sub(" ", canonical.lower().strip()), canonical, canonical in ambiguous)
+            for name in aliases:
+                self._add(_WS_RE.sub(" ", name.lower().strip()), canonical, False)
+        self._build()
+
+    def _add(self, pattern, canonical, ambiguous):
+        if not pattern:
+            return
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(len(self._patterns))
+        self._patterns.append((pattern, canonical, ambiguous))
+
+    def _build(self):
+        # BFS to set failure links; each state's outputs include those of its failure state
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find_spans(self, text, relaxed=False):
+        """
+        Yield (start, end, canonical) for every whole-word match in the whitespace-normalized
+        text. `relaxed` drops the list-context rule for ambiguous names (the text is
+        already known to be a skills section); their exact casing is still required.
+        """
+        # Line breaks survive in `original` (bullets are only recognised at a line start)
+        original = _WS_RE.sub(lambda m: "\n" if "\n" in m.group() else " ", text or "")
+        text = original.replace("\n", " ").lower()
+        if len(text) != len(original):
+            original = None  # lowercasing changed offsets (rare Unicode); ambiguous names are skipped
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for pid in out[state]:
+                pattern, canonical, ambiguous = self._patterns[pid]
+                start = i - len(pattern) + 1
+                if pattern[0].isalnum() and start > 0 and text[start - 1].isalnum():
+                    continue
+                if pattern[-1].isalnum() and i + 1 < len(text) and text[i + 1].isalnum():
+                    continue
+                if ambiguous and not _ambiguous_ok(original, start, i + 1, canonical, relaxed):
+                    continue
+                yield start, i + 1, canonical
+
+    def find(self, text, relaxed=False):
+        """Sorted canonical skill names found in `text`."""
+        return sorted({canonical for _, _, canonical in self.find_spans(text, relaxed)})
+
+def _ambiguous_ok(original, start, end, canonical, relaxed):
+    """
+    A bare ambiguous name counts only when written with its exact casing ("Go", not
+    "go"), when it is not part of a longer token ("C++", "C#", "Go-to-market",
+    "Objective-C"), and, unless `relaxed`, when it sits in a list: at the start of
+    the text, after a separator such as "," "/" "|" ":" or a bullet, or after
+    "and"/"or". "-", "–" and "*" are bullets only at a line start or before a space.
+    """
+    if original is None or original[start:end] != canonical:
+        return False
+    after = original[end:end + 2]
+    if after[:1] and (after[0] in "+#" or after[0] in _BULLETS and after[1:].isalnum()):
+        return False
+    j = start - 1
+    if j >= 0 and original[j] in " \n":
+        j -= 1
+    if j < 0:
+        return True
+    if original[j] in _BULLETS:
+        glued = j == start - 1 and j > 0 and original[j - 1] != "\n"
+        if glued and original[j - 1].isalnum():
+            return False  # "Objective-C" even in a skills section
+        return relaxed or not glued
+    if relaxed:
+        return True
+    return original[j] in _LIST_SEPARATORS or original[max(0, j - 7):j + 1].lower().endswith(_LIST_WORDS)
+
+def _cache_digest(path):
+    # Taxonomy and matcher code together: a change to either must not load a stale pickle
+    h = hashlib.sha256()
+    for source in (path, os.path.abspath(__file__)):
+        with open(source, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+@lru_cache(maxsize=4)
+def load_matcher(taxonomy_path=TAXONOMY_PATH):
+    """
+    The compiled matcher for a taxonomy file. The automaton is pickled under .cache/
+    keyed by the hash of the taxonomy and of this module, so later processes (and job
+    workers) load it instead of rebuilding it.
+    """
+    digest = _cache_digest(taxonomy_path)
+    cache_path = os.path.join(CACHE_DIR, f"skills_{digest}.pkl")
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            pass
+    with open(taxonomy_path, "r", encoding="utf-8") as f:
+        matcher = SkillMatcher(json.load(f))
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(matcher, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        print("⚠️ Could not cache skills automaton:", e)
+    return matcher
+
+def all_skills():
+    """Canonical skill names in the taxonomy (for filter pickers)."""
+    return load_matcher().skills
+
+# ---------- Sections ----------
+SECTION_HEADERS = {
+    "summary": ["summary", "profile", "professional summary", "career summary", "objective", "career objective", "about me"],
+    "experience": ["experience", "work experience", "professional experience", "employment history", "work history",
+                   "employment", "internships", "internship"],
+    "education": ["education", "academic background", "academics", "qualifications", "educational qualifications"],
+    "skills": ["skills", "technical skills", "key skills", "core competencies", "skill set", "skillset",
+               "technologies", "tools and technologies", "tech stack"],
+    "projects": ["projects", "academic projects", "personal projects", "key projects"],
+    "certifications": ["certifications", "certificates", "licenses and certifications", "courses"],
+    "achievements": ["achievements", "awards", "honors", "honours", "accomplishments"],
+    "publications": ["publications", "research"],
+    "languages": ["languages", "languages known"],
+    "interests": ["interests", "hobbies", "extracurricular activities"],
+}
+_HEADER_LOOKUP = {alias: section for section, aliases in SECTION_HEADERS.items() for alias in aliases}
+_HEADER_STRIP_RE = re.compile(r"^[\s#*•\-–—=_|]+|[\s:#*•\-–—=_|]+$")
+
+def detect_sections(text):
+    """
+    Split a resume into sections by header lines ("Work Experience", "SKILLS:", ...).
+    Returns {section: text}; lines before the first header go under "header".
+    """
+    sections = {}
+    current = "header"
+    for line in (text or "").splitlines():
+        key = _WS_RE.sub(" ", _HEADER_STRIP_RE.sub("", line).lower())
+        if len(key) <= 40 and key in _HEADER_LOOKUP:
+            current = _HEADER_LOOKUP[key]
+            sections.setdefault(current, [])
+            continue
+        sections.setdefault(current, []).append(line)
+    sections = {name: "\n".join(lines).strip() for name, lines in sections.items()}
+    return {name: body for name, body in sections.items() if name != "header" or body}
+
+def extract_profile(text):
+    """
+    {"skills": sorted canonical skills, "sections": sorted section names} for one resume.
+    Inside a detected skills section ambiguous names need only their exact casing.
+    """
+    matcher = load_matcher()
+    sections = detect_sections(text)
+    skills = set(matcher.find(text))
+    if sections.get("skills"):
+        skills.update(matcher.find(sections["skills"], relaxed=True))
+    return {
+        "skills": sorted(skills),
+        "sections": sorted(name for name in sections if name != "header"),
+    }
+
+def missing_skills(found, required):
+    """Required skills (canonical names) absent from `found`, in the order given."""
+    found = set(found or [])
+    return [s for s in (required or []) if s not in found]
+
+def filtered_result(name, missing, profile=None):
+    """Result entry for a resume missing a must-have skill (never encoded, never shortlisted)."""
+    res = {"name": name, "score": 0.0, "top_matches": [], "missing_skills": list(missing)}
+    res.update(profile or {})
+    return res
@@ -0,0 +1,96 @@
+# storage.py — compact encodings for resume text and top-match scores stored in MySQL
+import json
+import zlib
+import hashlib
+import numpy as np
+
+# zstd is preferred when installed; zlib is always available as a fallback
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# One-byte tags prefixed to every blob so readers never have to guess the codec
+CODEC_ZSTD = b"Z"
+CODEC_ZLIB = b"z"
+CODEC_RAW = b"r"
+
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 9
+
+def content_hash(text):
+    """
+    SHA-256 hex digest of the UTF-8 text. Used as the dedup key in `resume_blobs`,
+    so identical resumes are stored once however many rows reference them.
+    """
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+def encode_text(text):
+    """
+    Compress a string into a tagged blob (zstd if available, else zlib).
+    Tiny payloads that do not shrink are stored raw.
+    """
+    raw = (text or "").encode("utf-8")
+    if zstandard is not None:
+        packed = CODEC_ZSTD + zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    else:
+        packed = CODEC_ZLIB + zlib.compress(raw, ZLIB_LEVEL)
+    if len(packed) >= len(raw) + 1:
+        return CODEC_RAW + raw
+    return packed
+
+def decode_text(blob):
+    """
+    Inverse of `encode_text`. Accepts bytes/bytearray (mysql-connector returns
+    bytearray for BLOB columns) and returns a str, or None for an empty value.
+    """
+    if blob is None:
+        return None
+    blob = bytes(blob)
+    if not blob:
+        return ""
+    tag, payload = blob[:1], blob[1:]
+    if tag == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Blob is zstd-compressed but the 'zstandard' package is not installed.")
+        raw = zstandard.ZstdDecompressor().decompress(payload)
+    elif tag == CODEC_ZLIB:
+        raw = zlib.decompress(payload)
+    elif tag == CODEC_RAW:
+        raw = payload
+    else:
+        raise ValueError(f"Unknown storage codec tag: {tag!r}")
+    return raw.decode("utf-8")
+
+def pack_scores(scores):
+    """Pack a sequence of similarity scores as little-endian float16 bytes (2 bytes each)."""
+    return np.asarray(list(scores), dtype="<f2").tobytes()
+
+def unpack_scores(blob):
+    """Unpack float16 bytes produced by `pack_scores` into a list of Python floats."""
+    if not blob:
+        return []
+    return np.frombuffer(bytes(blob), dtype="<f2").astype(float).tolist()
+
+def encode_top_matches(top_matches):
+    """
+    Split `[{"sentence": ..., "score": ...}, ...]` into a compressed sentence blob
+    and a float16 score array. Returns (sentences_blob, scores_blob).
+    """
+    top_matches = top_matches or []
+    sentences = [m.get("sentence", "") for m in top_matches]
+    scores = [float(m.get("score", 0.0)) for m in top_matches]
+    return encode_text(json.dumps(sentences, ensure_ascii=False)), pack_scores(scores)
+
+def decode_top_matches(sentences_blob, scores_blob):
+    """Inverse of `encode_top_matches`; returns the list-of-dicts shape used by the app."""
+    if sentences_blob is None:
+        return []
+    sentences = json.loads(decode_text(sentences_blob) or "[]")
+    scores = unpack_scores(scores_blob)
+    return [{"sentence": s, "score": sc} for s, sc in zip(sentences, scores)]
+
+def plain_row_bytes(top_matches, resume_text):
+    """Bytes the legacy layout spends on one candidate (JSON `top_sentences` + `resume_text`)."""
+    top_json = json.dumps(top_matches or [], ensure_ascii=False).encode("utf-8")
+    return len(top_json) + len((resume_text or "").encode("utf-8"))
@@ -0,0 +1,104 @@
+# test_db.py — db.py helpers that need no MySQL server (fake connection)
+import json
+
+import db
+import storage
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self._result = []
+        self.rowcount = 0
+
+    def execute(self, sql, params=()):
+        self.conn.statements.append((sql, params))
+        self.rowcount = self.conn.rowcounts.pop(0) if sql.lstrip().startswith("UPDATE") and self.conn.rowcounts else 0
+        if sql.lstrip().startswith("SELECT"):
+            self._result, self.conn.pages = (self.conn.pages[0], self.conn.pages[1:]) if self.conn.pages else ([], [])
+
+    def executemany(self, sql, rows):
+        self.conn.statements.extend((sql, row) for row in rows)
+
+    def fetchall(self):
+        return self._result
+
+    def close(self):
+        pass
+
+
+class FakeConn:
+    def __init__(self, pages=(), rowcounts=()):
+        self.pages = list(pages)
+        self.rowcounts = list(rowcounts)
+        self.statements = []
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_backfill_skills_covers_plain_and_compact_rows(monkeypatch):
+    pages = [[
+        {"id": 1, "candidate_name": "plain", "resume_text": "Skills: Python, Kubernetes", "text_blob": None},
+        {"id": 2, "candidate_name": "compact", "resume_text": None,
+         "text_blob": storage.encode_text("Experience\nStack: Go, PostgreSQL")},
+    ]]
+    conn = FakeConn(pages)
+    monkeypatch.setattr(db, "init_db", lambda: conn)
+
+    assert db.backfill_skills() == 2
+    updates = [p for sql, p in conn.statements if sql.startswith("UPDATE shortlisted_resumes SET skills")]
+    assert json.loads(updates[0][0]) == ["Kubernetes", "Python"]
+    assert "Go" in json.loads(updates[1][0])
+    assert json.loads(updates[1][1]) == ["experience"]
+    skill_rows = [p for sql, p in conn.statements if sql == db._INSERT_SKILL_SQL]
+    assert ("plain", "Python") in skill_rows and ("compact", "Go") in skill_rows
+
+
+def test_fetch_query_requires_every_skill():
+    query, params = db._fetch_query(0.5, "", ["Python", "AWS", "Python"])
+    assert "resume_skills" in query
+    assert params == (0.5, "AWS", "Python", 2)
+
+
+def test_store_blob_refreshes_an_existing_blob_instead_of_reinserting():
+    conn = FakeConn(rowcounts=[1])
+    digest = db._store_blob(FakeCursor(conn), "same resume")
+    assert digest == storage.content_hash("same resume")
+    assert [sql for sql, _ in conn.statements] == [db._TOUCH_BLOB_SQL]
+
+
+def test_store_blob_inserts_a_missing_blob():
+    conn = FakeConn(rowcounts=[0])
+    db._store_blob(FakeCursor(conn), "new resume")
+    sql, params = conn.statements[-1]
+    assert sql == db._INSERT_BLOB_SQL
+    assert storage.decode_text(params[1]) == "new resume"
+    assert params[2] == len("new resume")
+
+
+def test_decode_row_plain_layout_is_left_as_is():
+    top = json.dumps([{"sentence": "s", "score": 0.5}])
+    row = {"candidate_name": "c", "resume_text": "text", "top_sentences": top,
+           "text_blob": None, "top_sentences_blob": None, "top_scores": None}
+    decoded = db._decode_row(row)
+    assert decoded["resume_text"] == "text" and decoded["top_sentences"] == top
+    assert not {"text_blob", "top_sentences_blob", "top_scores"} & set(decoded)
+
+
+def test_decode_row_compact_layout_matches_plain_shape():
+    matches = [{"sentence": "Built Kubernetes operators", "score": 0.75}]
+    sentences_blob, scores_blob = storage.encode_top_matches(matches)
+    row = {"candidate_name": "c", "resume_text": None, "top_sentences": None,
+           "text_blob": bytearray(storage.encode_text("full resume")),
+           "top_sentences_blob": bytearray(sentences_blob), "top_scores": bytearray(scores_blob)}
+    decoded = db._decode_row(row)
+    assert decoded["resume_text"] == "full resume"
+    assert json.loads(decoded["top_sentences"]) == matches
+    assert not {"text_blob", "top_sentences_blob", "top_scores"} & set(decoded)
@@ -0,0 +1,209 @@
+# test_db_async.py — pool/timeout/cancel behaviour of db_async against a fake pool (no MySQL needed)
+import time
+import asyncio
+import pytest
+
+import db_async
+
+
+class HangingCursor:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, *args):
+        await asyncio.sleep(5)
+
+
+class FakeConn:
+    def __init__(self):
+        self.closed = False
+
+    def cursor(self, *args):
+        return HangingCursor()
+
+    async def begin(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class FakePool:
+    def __init__(self):
+        self.acquired = []
+        self.released = []
+
+    async def acquire(self):
+        conn = FakeConn()
+        self.acquired.append(conn)
+        return conn
+
+    def release(self, conn):
+        self.released.append(conn)
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    fake = FakePool()
+
+    async def get_pool():
+        return fake
+
+    monkeypatch.setattr(db_async, "get_pool", get_pool)
+    return fake
+
+
+def test_run_returns_result_and_releases_open_connection(pool):
+    async def work(conn):
+        return "ok"
+
+    assert asyncio.run(db_async._run(work)) == "ok"
+    assert pool.released == pool.acquired
+    assert not pool.acquired[0].closed
+
+
+def test_run_timeout_closes_connection_before_release(pool):
+    async def work(conn):
+        await asyncio.sleep(5)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(db_async._run(work, timeout=0.05))
+    conn = pool.acquired[0]
+    assert conn.closed
+    assert pool.released == [conn]
+
+
+def test_run_cancel_closes_connection_before_release(pool):
+    async def main():
+        entered = asyncio.Event()
+
+        async def work(conn):
+            entered.set()
+            await asyncio.sleep(5)
+
+        task = asyncio.create_task(db_async._run(work))
+        await entered.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert pool.acquired[0].closed
+    assert pool.released == pool.acquired
+
+
+def test_insert_timeout_is_reported_not_raised(pool, monkeypatch, capsys):
+    monkeypatch.setattr(db_async, "QUERY_TIMEOUT", 0.05)
+    asyncio.run(db_async.insert_resume("c", "f", 0.5, 0.6, [], "text"))
+    assert "Timed out inserting resume" in capsys.readouterr().out
+    assert pool.acquired[0].closed
+
+
+def test_writer_drain_waits_only_for_given_futures(monkeypatch):
+    release = {}
+
+    async def fake_insert(name):
+        release.setdefault(name, asyncio.Event())
+        await release[name].wait()
+
+    monkeypatch.setattr(db_async, "insert_resume", fake_insert)
+    monkeypatch.setattr(db_async, "close_pool", lambda: asyncio.sleep(0))
+    writer = db_async.AsyncWriter()
+    try:
+        other = writer.submit_insert("other-session")
+        mine = writer.submit_insert("mine")
+        writer._loop.call_soon_threadsafe(lambda: release.setdefault("mine", asyncio.Event()).set())
+        assert writer.drain([mine], timeout=2) == []
+        assert mine.done()
+        # another session's write is neither awaited nor cancelled
+        assert not other.done()
+        writer._loop.call_soon_threadsafe(release["other-session"].set)
+        assert writer.drain([other], timeout=2) == []
+    finally:
+        writer.close()
+
+
+def test_writer_drain_timeout_bounds_the_whole_wait(monkeypatch):
+    async def fake_insert(name):
+        await asyncio.sleep(5)
+
+    monkeypatch.setattr(db_async, "insert_resume", fake_insert)
+    monkeypatch.setattr(db_async, "close_pool", lambda: asyncio.sleep(0))
+    writer = db_async.AsyncWriter()
+    try:
+        futures = [writer.submit_insert(f"r{i}") for i in range(5)]
+        started = time.perf_counter()
+        errors = writer.drain(futures, timeout=0.2)
+        assert time.perf_counter() - started < 1.0
+        assert len(errors) == 5
+        assert all(isinstance(e, asyncio.TimeoutError) for e in errors)
+        assert all(f.cancelled() or f.done() for f in futures)
+    finally:
+        writer.close()
+
+
+def _saver_writer(monkeypatch):
+    inserted, deleted = [], []
+
+    async def fake_insert(*record):
+        inserted.append(record[0])
+        return not record[0].startswith("existing")
+
+    async def fake_delete(candidate_name):
+        deleted.append(candidate_name)
+
+    monkeypatch.setattr(db_async, "insert_resume", fake_insert)
+    monkeypatch.setattr(db_async, "delete_resume", fake_delete)
+    monkeypatch.setattr(db_async, "close_pool", lambda: asyncio.sleep(0))
+    return db_async.AsyncWriter(), inserted, deleted
+
+
+def _record(name, score):
+    return (name, name, score, score, [], "text", None, None)
+
+
+def test_shortlist_saver_keeps_the_running_top_k(monkeypatch):
+    writer, inserted, deleted = _saver_writer(monkeypatch)
+    try:
+        saver = db_async.ShortlistSaver(writer, top_k=2, score_threshold=0.3)
+        for name, score in [("a", 0.5), ("low", 0.2), ("b", 0.6), ("c", 0.55), ("tie", 0.55), ("d", 0.9)]:
+            saver.offer(_record(name, score))
+        assert writer.drain(saver.futures, timeout=2) == []
+    finally:
+        writer.close()
+    # below threshold and ties with the current K-th are never written
+    assert inserted == ["a", "b", "c", "d"]
+    # a and c were written and then pushed out: rows this run created are removed
+    assert sorted(deleted) == ["a", "c"]
+    assert set(inserted) - set(deleted) == {"b", "d"}
+
+
+def test_shortlist_saver_keeps_rows_it_did_not_create(monkeypatch):
+    writer, inserted, deleted = _saver_writer(monkeypatch)
+    try:
+        saver = db_async.ShortlistSaver(writer, top_k=1, score_threshold=0.0)
+        saver.offer(_record("existing-row", 0.4))
+        saver.offer(_record("new-row", 0.8))
+        assert writer.drain(saver.futures, timeout=2) == []
+    finally:
+        writer.close()
+    assert inserted == ["existing-row", "new-row"]
+    assert deleted == []
+
+
+def test_shortlist_saver_seeded_results_are_written_once_at_the_end(monkeypatch):
+    writer, inserted, deleted = _saver_writer(monkeypatch)
+    try:
+        saver = db_async.ShortlistSaver(writer, top_k=2, score_threshold=0.0)
+        saver.seed(_record("seed-low", 0.1))
+        saver.seed(_record("seed-high", 0.9))
+        saver.offer(_record("new", 0.5))
+        saver.write_seeded()
+        assert writer.drain(saver.futures, timeout=2) == []
+    finally:
+        writer.close()
+    assert sorted(inserted) == ["new", "seed-high"]
+    assert deleted == []
@@ -0,0 +1,68 @@
+# test_dedup.py — exact and near-duplicate detection that decides which resumes are never scored
+import numpy as np
+
+from dedup import (DuplicateIndex, fingerprint, exact_hash, minhash, signature_to_bytes, signature_from_bytes,
+                   attach_duplicates, NEAR_DUP_THRESHOLD)
+
+RESUME = (
+    "Jane Doe. Senior backend engineer with eight years of experience building payment systems in Python "
+    "and Go. Designed event driven services on Kubernetes and AWS, led a team of six engineers, "
+    "migrated a monolith to microservices and cut p99 latency by forty percent. Mentored junior developers, "
+    "ran on-call rotations, and introduced contract testing across twelve services. Holds a BTech in "
+    "computer science and an AWS Solutions Architect certification."
+)
+UNRELATED = (
+    "John Smith. Registered nurse with ten years in intensive care units, trained in trauma response, "
+    "patient triage and ventilator management. Coordinated shift schedules for a ward of forty beds and "
+    "taught first aid courses to community volunteers on weekends."
+)
+
+
+def _add(index, key, text):
+    return index.add(key, *fingerprint(text))
+
+
+def test_exact_copy_with_whitespace_case_and_punctuation_changes():
+    reformatted = "  " + RESUME.upper().replace(". ", ".\n\n").replace(",", " ,") + "\n"
+    assert exact_hash(reformatted) == exact_hash(RESUME)
+    index = DuplicateIndex(threshold=0.9)
+    assert _add(index, 1, RESUME) is None
+    assert _add(index, 2, reformatted) == 1
+
+
+def test_near_copy_above_threshold_maps_to_first_upload():
+    near = RESUME.replace("forty percent", "forty five percent")
+    assert exact_hash(near) != exact_hash(RESUME)
+    similarity = float(np.mean(minhash(near) == minhash(RESUME)))
+    assert similarity >= NEAR_DUP_THRESHOLD
+    index = DuplicateIndex()
+    assert _add(index, 1, RESUME) is None
+    assert _add(index, 2, near) == 1
+
+
+def test_unrelated_resume_is_new():
+    index = DuplicateIndex(threshold=0.9)
+    assert _add(index, 1, RESUME) is None
+    assert _add(index, 2, UNRELATED) is None
+    # both are representatives now: a copy of either maps back to it
+    assert _add(index, 3, UNRELATED) == 2
+
+
+def test_threshold_one_collapses_exact_copies_only():
+    near = RESUME.replace("forty percent", "forty five percent")
+    index = DuplicateIndex(threshold=1.0)
+    assert _add(index, 1, RESUME) is None
+    assert _add(index, 2, near) is None
+    assert _add(index, 3, RESUME.lower()) == 1
+
+
+def test_signature_bytes_round_trip():
+    sig = minhash(RESUME)
+    assert np.array_equal(signature_from_bytes(signature_to_bytes(sig)), sig)
+
+
+def test_attach_duplicates_groups_names_under_representative():
+    results = {1: {"name": "a.pdf"}, 2: {"name": "b.pdf"}}
+    attach_duplicates(results, [("a_copy.docx", 1), ("a_again.txt", 1), ("orphan.pdf", 9)])
+    assert results[1]["duplicates"] == ["a_copy.docx", "a_again.txt"]
+    assert "duplicates" not in results[2]
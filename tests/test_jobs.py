@@ -0,0 +1,95 @@
+# test_jobs.py — background job checkpoints and resume (fake model and scorer, no MySQL)
+import io
+import os
+import sys
+import types
+import pytest
+
+import db_async
+import jobs
+
+
+class Upload(io.BytesIO):
+    def __init__(self, name, text):
+        super().__init__(text.encode("utf-8"))
+        self.name = name
+
+
+class FakeModel:
+    def __init__(self, name):
+        self.name = name
+
+    def encode(self, text, **kwargs):
+        return text
+
+
+class Interrupted(BaseException):
+    """Stands in for the worker being killed: not caught by run_job's failure handler."""
+
+
+@pytest.fixture
+def job_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "JOBS_DIR", str(tmp_path))
+    monkeypatch.setattr(jobs, "JOBS_DB", str(tmp_path / "jobs.sqlite3"))
+    monkeypatch.setitem(sys.modules, "sentence_transformers", types.SimpleNamespace(SentenceTransformer=FakeModel))
+
+    def no_writer():
+        raise RuntimeError("no database in tests")
+    monkeypatch.setattr(db_async, "AsyncWriter", no_writer)
+
+    calls = []
+
+    def score_extracted(jd_embedding, name, text, model):
+        calls.append(name)
+        if len(calls) == 1:
+            raise Interrupted()
+        return {"name": name, "score": 0.8 if text else 0.0, "top_matches": []}
+
+    scoring = types.SimpleNamespace(score_extracted=score_extracted,
+                                    db_record=lambda candidate_name, res: (candidate_name,))
+    monkeypatch.setitem(sys.modules, "scoring", scoring)
+    return calls
+
+
+def _item_paths(job_id):
+    conn = jobs._connect()
+    try:
+        return [row["path"] for row in conn.execute("SELECT path FROM job_items WHERE job_id = ?", (job_id,))]
+    finally:
+        conn.close()
+
+
+def test_interrupted_job_resumes_from_spooled_upload(job_store, monkeypatch):
+    job_id = jobs.create_job([Upload("alice.txt", "Python developer with Django and PostgreSQL.")],
+                             "Python developer", "fake-model", 0.5)
+    (path,) = _item_paths(job_id)
+
+    with pytest.raises(Interrupted):
+        jobs.run_job(job_id)
+    # Not checkpointed yet, so the upload must still be there for the next worker
+    assert jobs.job_status(job_id)["status"] == "running"
+    assert os.path.exists(path)
+
+    monkeypatch.setattr(jobs, "_pid_alive", lambda pid: False)
+    monkeypatch.setattr(jobs, "start_worker", jobs.run_job)
+    assert jobs.resume_interrupted_jobs() == [job_id]
+
+    results, errors = jobs.job_results(job_id)
+    assert errors == []
+    assert [(r["name"], r["score"]) for r in results] == [("alice.txt", 0.8)]
+    assert "error" not in results[0]
+    assert job_store == ["alice.txt", "alice.txt"]
+    assert jobs.job_status(job_id)["status"] == "done"
+    assert not os.path.exists(path)
+
+
+def test_checkpointed_item_drops_its_spooled_upload(job_store):
+    job_store.append("warm-up")  # skip the simulated interruption
+    job_id = jobs.create_job([Upload("bob.txt", "Go and Kubernetes engineer.")], "Go engineer", "fake-model", 0.5)
+    (path,) = _item_paths(job_id)
+
+    jobs.run_job(job_id)
+
+    assert not os.path.exists(path)
+    results, errors = jobs.job_results(job_id)
+    assert [r["score"] for r in results] == [0.8]
@@ -0,0 +1,67 @@
+# test_skills.py — skill matching (incl. ambiguous names) and section detection
+import pytest
+
+import skills
+from skills import extract_profile, detect_sections, missing_skills
+
+
+@pytest.mark.parametrize("text", [
+    "SKILLS: Ruby, Rust, Go, Swift, R, C, Python",
+    "Languages: Ruby / Rust / Go / Swift / R / C",
+    "• Ruby\n• Rust\n• Go\n• Swift\n• R\n• C",
+    "- Ruby\n- Rust\n-Go\n* Swift\n– R\n*C",
+])
+def test_list_of_short_language_names_is_found(text):
+    found = extract_profile(text)["skills"]
+    for skill in ("Ruby", "Rust", "Go", "Swift", "R", "C"):
+        assert skill in found
+
+
+def test_ambiguous_names_match_bare_inside_skills_section():
+    text = "Summary\nBackend developer.\n\nTechnical Skills\nGo\nR\nC\n"
+    assert {"Go", "R", "C"} <= set(extract_profile(text)["skills"])
+
+
+def test_ambiguous_names_need_casing_and_list_context():
+    text = "I will go to the office. A grade C student. See section R of the plan."
+    found = extract_profile(text)["skills"]
+    assert not {"Go", "C", "R"} & set(found)
+    assert "C" not in extract_profile("Objective-C developer")["skills"]
+    assert "Go" not in extract_profile("- Go-to-market plan")["skills"]
+    assert "Go" not in extract_profile("Led the launch team-Go live in March")["skills"]
+    assert "C" not in extract_profile("Skills\nObjective-C, Swift")["skills"]
+
+
+def test_c_is_not_found_inside_cpp_or_csharp():
+    found = extract_profile("Skills: C++, C#")["skills"]
+    assert "C++" in found and "C#" in found
+    assert "C" not in found
+
+
+def test_after_and_counts_as_list():
+    assert "Go" in extract_profile("Built services in Python and Go")["skills"]
+
+
+def test_synonyms_map_to_canonical_name_and_respect_word_boundaries():
+    found = extract_profile("Ran k8s clusters; wrote javascript daily")["skills"]
+    assert "Kubernetes" in found and "JavaScript" in found
+    assert "Java" not in found
+
+
+def test_detect_sections():
+    sections = detect_sections("Jane Doe\nWORK EXPERIENCE:\nAcme\n## Education\nBTech")
+    assert sections == {"header": "Jane Doe", "experience": "Acme", "education": "BTech"}
+
+
+def test_missing_skills_keeps_requested_order():
+    assert missing_skills(["Python"], ["Kubernetes", "Python", "Go"]) == ["Kubernetes", "Go"]
+
+
+def test_matcher_cache_key_covers_module_code(tmp_path, monkeypatch):
+    taxonomy = tmp_path / "taxonomy.json"
+    taxonomy.write_text('{"skills": {"Python": []}}')
+    before = skills._cache_digest(str(taxonomy))
+    module = tmp_path / "skills.py"
+    module.write_text("# changed matcher code")
+    monkeypatch.setattr(skills, "__file__", str(module))
+    assert skills._cache_digest(str(taxonomy)) != before
@@ -0,0 +1,51 @@
+# test_storage.py — round trips of the compact storage encodings
+import json
+import zlib
+
+import pytest
+
+import storage
+
+
+@pytest.mark.parametrize("text", ["", "a", "Résumé — naïve café ✅\n" * 200, "x" * 100000])
+def test_encode_decode_text_round_trip(text):
+    blob = storage.encode_text(text)
+    assert storage.decode_text(blob) == text
+    assert storage.decode_text(bytearray(blob)) == text  # mysql-connector hands back bytearray
+
+
+def test_repetitive_text_is_compressed_and_tiny_text_stored_raw():
+    assert len(storage.encode_text("python developer " * 500)) < 200
+    assert storage.encode_text("hi")[:1] == storage.CODEC_RAW
+
+
+def test_zlib_blobs_stay_readable():
+    blob = storage.CODEC_ZLIB + zlib.compress("legacy text".encode("utf-8"))
+    assert storage.decode_text(blob) == "legacy text"
+
+
+def test_decode_text_none_and_unknown_tag():
+    assert storage.decode_text(None) is None
+    with pytest.raises(ValueError):
+        storage.decode_text(b"?abc")
+
+
+def test_top_matches_round_trip_within_float16_precision():
+    matches = [{"sentence": "Built Kubernetes operators", "score": 0.8123},
+               {"sentence": "Led a team of five", "score": 0.1}]
+    sentences_blob, scores_blob = storage.encode_top_matches(matches)
+    assert len(scores_blob) == 2 * len(matches)
+    decoded = storage.decode_top_matches(sentences_blob, scores_blob)
+    assert [m["sentence"] for m in decoded] == [m["sentence"] for m in matches]
+    for got, want in zip(decoded, matches):
+        assert got["score"] == pytest.approx(want["score"], abs=1e-3)
+
+
+def test_empty_top_matches_round_trip():
+    assert storage.decode_top_matches(*storage.encode_top_matches([])) == []
+
+
+def test_content_hash_is_stable_and_text_sensitive():
+    assert storage.content_hash("a") == storage.content_hash("a")
+    assert storage.content_hash("a") != storage.content_hash("b")
+    assert storage.content_hash(None) == storage.content_hash("")